@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+    callback: custom_stats_checksum
+    type: aggregate
+    short_description: Checksum the final set_stats artifact
+    description:
+        - When the playbook ends, serializes the custom stats set by C(set_stats)
+          the way C(to_json) does with sorted keys, and writes one
+          C(custom_stats) record with its sha1 checksum, size and the time the
+          serialization took.
+        - If the last record already in the file is a C(set_stats_expected)
+          record, as written by set_stats_stress.yml, the new record also says
+          whether the checksums match.
+    version_added: "2.8"
+    requirements:
+      - enable in configuration, e.g. ANSIBLE_CALLBACKS_ENABLED=custom_stats_checksum
+    options:
+        output_file:
+            description: JSON lines file to append the record to
+            default: custom_stats.jsonl
+            ini:
+              - section: callback_custom_stats_checksum
+                key: output_file
+            env:
+              - name: CUSTOM_STATS_CHECKSUM_OUTPUT_FILE
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from ansible.parsing.ajson import AnsibleJSONEncoder
+from ansible.plugins.callback import CallbackBase
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'custom_stats_checksum'
+    CALLBACK_NEEDS_WHITELIST = True
+    CALLBACK_NEEDS_ENABLED = True
+
+    def expected(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path) as records:
+            lines = records.read().splitlines()
+        record = json.loads(lines[-1]) if lines else {}
+        return record if record.get('type') == 'set_stats_expected' else None
+
+    def v2_playbook_on_stats(self, stats):
+        path = self.get_option('output_file')
+        started = time.time()
+        artifact = json.dumps(stats.custom, cls=AnsibleJSONEncoder, sort_keys=True)
+        checksum = hashlib.sha1(artifact.encode('utf-8')).hexdigest()
+        record = {'type': 'custom_stats', 'checksum': checksum, 'bytes': len(artifact),
+                  'keys': len(stats.custom), 'serialize_seconds': time.time() - started}
+        expected = self.expected(path)
+        if expected:
+            record['expected'] = expected['checksum']
+            record['matches'] = expected['checksum'] == checksum
+        with open(path, 'a') as output:
+            output.write(json.dumps(record, sort_keys=True) + '\n')
+        self._display.display('CUSTOM STATS CHECKSUM: {checksum} ({bytes} bytes, {serialize_seconds:.3f}s)'.format(**record)
+                              + ('' if 'matches' not in record else ', matches expected: {}'.format(record['matches'])))
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+    callback: task_timing
+    type: aggregate
+    short_description: Write per-task and per-host timings as JSON lines
+    description:
+        - Writes one C(host_task) record per task result as it arrives, then one
+          C(task) record per task, one C(host) record per host and a final
+          C(playbook) record when the playbook ends.
+        - Times are controller wall clock seconds since the epoch.
+        - With C(profile), every record also has the controller CPU seconds
+          (C(cpu_seconds) for the controller process, C(children_cpu_seconds)
+          for the workers it reaped, which run the tasks) and the controller
+          RSS growth in bytes.  A task is charged with everything the
+          controller did from its start to the start of the next task.  The
+          playbook record gets the peak RSS, a C(top_tasks) record lists the
+          C(top) tasks with the most wall time, CPU time and RSS growth, and
+          the slowest are shown when the playbook ends.
+        - RSS is read from /proc/self/statm, or is the peak RSS where there is
+          no /proc.
+    version_added: "2.8"
+    requirements:
+      - enable in configuration, e.g. ANSIBLE_CALLBACKS_ENABLED=task_timing
+    options:
+        output_file:
+            description: JSON lines file to append the records to
+            default: task_timing.jsonl
+            ini:
+              - section: callback_task_timing
+                key: output_file
+            env:
+              - name: TASK_TIMING_OUTPUT_FILE
+        profile:
+            description: Also record controller CPU time and RSS growth
+            default: false
+            type: bool
+            ini:
+              - section: callback_task_timing
+                key: profile
+            env:
+              - name: TASK_TIMING_PROFILE
+        top:
+            description: Number of tasks in the top_tasks record and on screen with C(profile)
+            default: 10
+            type: int
+            ini:
+              - section: callback_task_timing
+                key: top
+            env:
+              - name: TASK_TIMING_TOP
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+PROFILE_KEYS = ('cpu_seconds', 'children_cpu_seconds', 'rss_growth')
+
+
+def peak_rss():
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (IOError, OSError, IndexError, ValueError):
+        return peak_rss()
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'task_timing'
+    CALLBACK_NEEDS_WHITELIST = True
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, *args, **kwargs):
+        super(CallbackModule, self).__init__(*args, **kwargs)
+        self.output = None
+        self.playbook = None
+        self.play = None
+        self.profile = False
+        self.peak_rss = 0
+        self.started = self.sample()
+        self.tasks = {}
+        self.task_order = []
+        self.hosts = {}
+        self.running = {}
+        self.current = None
+
+    def set_options(self, *args, **kwargs):
+        super(CallbackModule, self).set_options(*args, **kwargs)
+        self.output = open(self.get_option('output_file'), 'a')
+        self.profile = self.get_option('profile')
+
+    def write(self, record):
+        self.output.write(json.dumps(record, sort_keys=True) + '\n')
+
+    def sample(self):
+        """Wall time and, with profile, controller CPU time and RSS."""
+        now = {'time': time.time()}
+        if self.profile:
+            own = resource.getrusage(resource.RUSAGE_SELF)
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            now.update(cpu=own.ru_utime + own.ru_stime, children_cpu=children.ru_utime + children.ru_stime,
+                       rss=rss())
+            self.peak_rss = max(self.peak_rss, now['rss'])
+        return now
+
+    def usage(self, start, end):
+        if not self.profile:
+            return {}
+        return {'cpu_seconds': end['cpu'] - start.get('cpu', end['cpu']),
+                'children_cpu_seconds': end['children_cpu'] - start.get('children_cpu', end['children_cpu']),
+                'rss_growth': end['rss'] - start.get('rss', end['rss'])}
+
+    def v2_playbook_on_start(self, playbook):
+        self.playbook = playbook._file_name
+        self.started = self.sample()
+
+    def v2_playbook_on_play_start(self, play):
+        self.close_task()
+        self.play = play.get_name()
+
+    def task_record(self, task):
+        # Dynamically included tasks get a copy per host, so aggregate them
+        # by where they are defined rather than by uuid.
+        key = (self.play, task.get_path() or task._uuid, task.get_name())
+        if key not in self.tasks:
+            self.tasks[key] = {'type': 'task', 'play': self.play, 'task': task.get_name(),
+                               'action': task.action, 'path': task.get_path(), 'hosts': 0,
+                               'start': None, 'end': None, 'host_seconds': 0.0, 'host_seconds_max': 0.0}
+            if self.profile:
+                self.tasks[key].update((key, 0) for key in PROFILE_KEYS)
+            self.task_order.append(key)
+        return self.tasks[key]
+
+    def close_task(self, end=None):
+        """Charge the running task with the controller usage since it started."""
+        if self.current is None:
+            return
+        record, start = self.current
+        for key, value in self.usage(start, end or self.sample()).items():
+            record[key] += value
+        self.current = None
+
+    def start_task(self, task):
+        record = self.task_record(task)
+        if self.profile:
+            now = self.sample()
+            self.close_task(now)
+            self.current = (record, now)
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self.start_task(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self.start_task(task)
+
+    def v2_runner_on_start(self, host, task):
+        self.running[(host.get_name(), task._uuid)] = self.sample()
+
+    def finish(self, result, status):
+        end = self.sample()
+        host = result._host.get_name()
+        task = result._task
+        start_sample = self.running.pop((host, task._uuid), end)
+        start = start_sample['time']
+        seconds = end['time'] - start
+        host_task = {'type': 'host_task', 'playbook': self.playbook, 'play': self.play,
+                     'task': task.get_name(), 'action': task.action, 'path': task.get_path(),
+                     'host': host, 'status': status, 'start': start, 'end': end['time'], 'seconds': seconds}
+        host_task.update(self.usage(start_sample, end))
+        if self.profile:
+            host_task['rss'] = end['rss']
+        self.write(host_task)
+
+        record = self.task_record(task)
+        record['hosts'] += 1
+        record['start'] = start if record['start'] is None else min(record['start'], start)
+        record['end'] = end['time'] if record['end'] is None else max(record['end'], end['time'])
+        record['host_seconds'] += seconds
+        record['host_seconds_max'] = max(record['host_seconds_max'], seconds)
+
+        host_record = self.hosts.setdefault(host, {'type': 'host', 'host': host, 'tasks': 0,
+                                                   'start': start, 'end': end['time'], 'seconds': 0.0})
+        host_record['tasks'] += 1
+        host_record['start'] = min(host_record['start'], start)
+        host_record['end'] = max(host_record['end'], end['time'])
+        host_record['seconds'] += seconds
+
+    def v2_runner_on_ok(self, result):
+        self.finish(result, 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self.finish(result, 'ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self.finish(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self.finish(result, 'unreachable')
+
+    def top(self, tasks, key):
+        return sorted(tasks, key=lambda task: task[key], reverse=True)[:self.get_option('top')]
+
+    def v2_playbook_on_stats(self, stats):
+        end = self.sample()
+        self.close_task(end)
+        tasks = []
+        for key in self.task_order:
+            record = self.tasks[key]
+            if record['hosts']:
+                record['seconds'] = record['end'] - record['start']
+                self.write(record)
+                tasks.append(record)
+        for host in sorted(self.hosts):
+            self.write(self.hosts[host])
+        playbook = {'type': 'playbook', 'playbook': self.playbook, 'start': self.started['time'],
+                    'end': end['time'], 'seconds': end['time'] - self.started['time'], 'hosts': len(self.hosts),
+                    'tasks': len(tasks)}
+        playbook.update(self.usage(self.started, end))
+        if self.profile:
+            playbook.update(rss=end['rss'], peak_rss=max(self.peak_rss, peak_rss()))
+        self.write(playbook)
+        if self.profile:
+            top = {'type': 'top_tasks', 'playbook': self.playbook, 'top': self.get_option('top')}
+            for key in ('seconds',) + PROFILE_KEYS:
+                top[key] = [dict((field, task[field]) for field in ('play', 'task', 'path', 'hosts', key))
+                            for task in self.top(tasks, key)]
+            self.write(top)
+        self.output.close()
+
+        if self.profile:
+            self._display.banner('TASK PROFILE')
+            for task in self.top(tasks, 'seconds'):
+                self._display.display('{:>9.3f}s {:>9.3f}s cpu {:>+12.1f} KiB rss  {} : {}'.format(
+                    task['seconds'], task['cpu_seconds'] + task['children_cpu_seconds'], task['rss_growth'] / 1024.0,
+                    task['play'], task['task']))
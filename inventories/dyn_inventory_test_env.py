@@ -1,27 +1,24 @@
 #!/usr/bin/env python
-from argparse import ArgumentParser
-from datetime import datetime
 import os
+import sys
 
-inventory = {'all': {'vars': {'ansible_connection': 'local'}},
-             'ungrouped': {'hosts': ['localhost']},
-             '_meta': {'hostvars': {'localhost': {'test_env': os.environ.get('TEST_ENV', False),
-                                                  'current_time': str(datetime.now())}}}}
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+from lean_inventory import run  # noqa
 
 
-def parse_args():
-    parser = ArgumentParser()
-    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
-                        help='List instances (default: True)')
-    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
-    return parser.parse_args()
+def host_vars(host):
+    if host != 'localhost':
+        return {}
+    from datetime import datetime
+    return {'test_env': os.environ.get('TEST_ENV', False),
+            'current_time': str(datetime.now())}
 
 
-def load_inventory():
-    args = parse_args()
-    if args.list_instances:
-        print(inventory)
+def list_inventory():
+    return {'all': {'vars': {'ansible_connection': 'local'}},
+            'ungrouped': {'hosts': ['localhost']},
+            '_meta': {'hostvars': {'localhost': host_vars('localhost')}}}
 
 
 if __name__ == '__main__':
-    load_inventory()
+    run(list_inventory, host_vars)
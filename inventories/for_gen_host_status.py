@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# Generated counterpart of for_gen_host_status.ini for gen_host_status.yml.
+#
+# Hosts are named <index>_<outcome> and spread evenly over the outcome mix:
+#
+#   --host-count / GEN_HOST_STATUS_HOST_COUNT   number of hosts (default: 6)
+#   --mix / GEN_HOST_STATUS_MIX                 outcome weights, e.g.
+#                                               ok=80,failed=5,unreachable=1
+#                                               (default: the six outcomes of
+#                                               for_gen_host_status.ini)
+#   --expected                                  print the PLAY RECAP totals
+#                                               gen_host_status.yml must report
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+from lean_inventory import dump, request  # noqa
+
+OUTCOMES = ('ok', 'skipped', 'changed', 'failed', 'ignored', 'rescued', 'unreachable')
+
+DEFAULT_MIX = 'ok=1,skipped=1,changed=1,failed=1,ignored=1,rescued=1'
+
+# Per-host stats each outcome produces in gen_host_status.yml, task by task.
+EXPECTED_STATS = {
+    'ok': {'ok': 1, 'skipped': 6},
+    'skipped': {'skipped': 7},
+    'changed': {'ok': 2, 'changed': 1, 'skipped': 5},
+    'failed': {'ok': 1, 'skipped': 1, 'failures': 1},
+    'ignored': {'ok': 2, 'ignored': 1, 'skipped': 5},
+    'rescued': {'ok': 2, 'rescued': 1, 'skipped': 5},
+    'unreachable': {'ok': 2, 'skipped': 4, 'unreachable': 1},
+}
+
+STATS = ('ok', 'changed', 'unreachable', 'failures', 'skipped', 'rescued', 'ignored')
+
+
+def parse_mix(mix):
+    weights = {}
+    for entry in mix.split(','):
+        outcome, _, weight = entry.partition('=')
+        outcome = outcome.strip()
+        if outcome not in OUTCOMES:
+            raise ValueError('Unknown outcome {!r}, expected one of {}'.format(outcome, ', '.join(OUTCOMES)))
+        weights[outcome] = float(weight or 1)
+    return [(outcome, weights[outcome]) for outcome in OUTCOMES if weights.get(outcome)]
+
+
+def assign_outcomes(host_count, weights):
+    """Interleave outcomes so every prefix of the hosts follows the mix."""
+    total = sum(weight for _, weight in weights)
+    assigned = dict((outcome, 0) for outcome, _ in weights)
+    outcomes = []
+    for i in range(1, host_count + 1):
+        outcome = max(weights, key=lambda entry: entry[1] * i / total - assigned[entry[0]])[0]
+        assigned[outcome] += 1
+        outcomes.append(outcome)
+    return outcomes
+
+
+def hosts(host_count, weights):
+    width = len(str(host_count))
+    return ['{:0{}d}_{}'.format(i, width, outcome)
+            for i, outcome in enumerate(assign_outcomes(host_count, weights), 1)]
+
+
+def expected(host_count, weights):
+    outcomes = dict((outcome, 0) for outcome, _ in weights)
+    for outcome in assign_outcomes(host_count, weights):
+        outcomes[outcome] += 1
+    totals = dict((stat, sum(EXPECTED_STATS[outcome].get(stat, 0) * count
+                             for outcome, count in outcomes.items()))
+                  for stat in STATS)
+    return {'hosts': host_count,
+            'outcomes': outcomes,
+            'per_host': dict((outcome, EXPECTED_STATS[outcome]) for outcome in outcomes),
+            'totals': totals}
+
+
+def parse_args():
+    from argparse import ArgumentParser
+    parser = ArgumentParser()
+    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
+                        help='List instances (default: True)')
+    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser.add_argument('--host-count', dest='host_count', type=int,
+                        default=int(os.environ.get('GEN_HOST_STATUS_HOST_COUNT', 6)),
+                        help='Number of hosts (env: GEN_HOST_STATUS_HOST_COUNT, default: 6)')
+    parser.add_argument('--mix', default=os.environ.get('GEN_HOST_STATUS_MIX', DEFAULT_MIX),
+                        help='Outcome weights (env: GEN_HOST_STATUS_MIX, default: {})'.format(DEFAULT_MIX))
+    parser.add_argument('--expected', action='store_true', help='Print the expected PLAY RECAP totals')
+    return parser.parse_args()
+
+
+def load_inventory():
+    lean = request()
+    if lean:
+        if lean[0] == 'host':
+            return dump({})
+        host_count = int(os.environ.get('GEN_HOST_STATUS_HOST_COUNT', 6))
+        weights = parse_mix(os.environ.get('GEN_HOST_STATUS_MIX', DEFAULT_MIX))
+        return dump({'ungrouped': {'hosts': hosts(host_count, weights)}, '_meta': {'hostvars': {}}})
+    args = parse_args()
+    weights = parse_mix(args.mix)
+    if args.expected:
+        json.dump(expected(args.host_count, weights), sys.stdout, sort_keys=True, indent=4)
+        sys.stdout.write('\n')
+    elif args.requested_host:
+        dump({})
+    else:
+        dump({'ungrouped': {'hosts': hosts(args.host_count, weights)}, '_meta': {'hostvars': {}}})
+
+
+if __name__ == '__main__':
+    load_inventory()
@@ -1,53 +1,123 @@
 #!/usr/bin/env python
-from argparse import ArgumentParser
-from pprint import pprint
-import json
-
-inventory = {'group_one': {'hosts': ['group_one_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
-                           'vars': {'is_in_group_one': True,
-                                    'complex_var': [{"dir": "/opt/gwaf/logs",
-                                                     "sourcetype": "gwaf",
-                                                     "something_else": [1, 2, 3]}]}},
-             'group_two': {'hosts': ['group_two_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_two_and_three_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
-                           'vars': {'is_in_group_two': True}},
-             'group_three': {'hosts': ['group_three_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_two_and_three_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
-                             'vars': {'is_in_group_three': True}},
-             'all': {'vars': {'ansible_connection': 'local',
-                              'inventories_var': True}},
-             'ungrouped': {'hosts': ['ungrouped_host_0{}'.format(i) for i in range(1, 6)]}}
-
-hostvars = {'group_one_host_01': {'group_one_host_01_has_this_var': True},
-            'group_two_host_01': {'group_two_host_01_has_this_var': True},
-            'group_three_host_01': {'group_three_host_01_has_this_var': True}}
-
-
-def dumps(dct):
-    return json.dumps(dct, sort_keys=True, indent=4, separators=(',', ': '))
+# Same inventory as dyn_inventory.py but without _meta, so a consumer has to
+# call --host once per host.  Scales with the flags and DYN_INVENTORY_*
+# environment variables of ../utils/inventory_generator.py, plus:
+#
+#   --serve          answer batched lookups from a precomputed index: every
+#                    stdin line holds whitespace separated host names and is
+#                    answered by one JSON line mapping each host to its vars
+#   --timing-file    append one JSON line per --list/--host/--serve call
+#   --benchmark      fork one --host per host, then resolve the same hosts
+#                    through a single --serve process, and print both timings
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+from inventory_generator import SyntheticInventory, build_parser, dumps, env_parameters, from_args, parameter_env  # noqa
+from lean_inventory import request  # noqa
+
+STARTED = time.time()
+
+FIXTURE = dict(group_offset=0, ungrouped_start=1,
+               all_vars={'ansible_connection': 'local',
+                         'inventories_var': True},
+               group_vars={'group_one': {'complex_var': [{"dir": "/opt/gwaf/logs",
+                                                          "sourcetype": "gwaf",
+                                                          "something_else": [1, 2, 3]}]}})
 
 
 def parse_args():
-    parser = ArgumentParser()
-    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
-                        help='List instances (default: True)')
-    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser = build_parser()
+    parser.add_argument('--serve', action='store_true', help='Answer batched host lookups on stdin')
+    parser.add_argument('--timing-file', dest='timing_file', default=os.environ.get('DYN_INVENTORY_TIMING_FILE'),
+                        help='Append per-call timings as JSON lines (env: DYN_INVENTORY_TIMING_FILE)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compare one --host process per host against one --serve process')
+    parser.add_argument('--batch-size', dest='batch_size', type=int, default=500,
+                        help='Hosts per --serve request in --benchmark (default: 500)')
     return parser.parse_args()
 
 
+def record(timing_file, mode, hosts, started):
+    if timing_file:
+        from datetime import datetime
+        with open(timing_file, 'a') as timings:
+            timings.write(dumps({'mode': mode, 'hosts': hosts, 'pid': os.getpid(),
+                                 'seconds': time.time() - started,
+                                 'timestamp': str(datetime.now())}) + '\n')
+
+
+def serve(inventory, timing_file):
+    index = inventory.index()
+    for line in iter(sys.stdin.readline, ''):
+        started = time.time()
+        hosts = line.split()
+        sys.stdout.write(dumps(dict((host, index.get(host, {})) for host in hosts)) + '\n')
+        sys.stdout.flush()
+        record(timing_file, 'serve', len(hosts), started)
+
+
+def benchmark(inventory, args):
+    import json
+    import subprocess
+    # Parameters go through the environment so that every child is called
+    # like Ansible calls it, with nothing but --host <name>.
+    command = [sys.executable, os.path.abspath(__file__)]
+    env = parameter_env(args)
+    if args.timing_file:
+        env['DYN_INVENTORY_TIMING_FILE'] = args.timing_file
+    hosts = list(inventory.iter_hosts())
+
+    started = time.time()
+    forked = {}
+    for host in hosts:
+        forked[host] = json.loads(subprocess.check_output(command + ['--host', host], env=env).decode('utf-8'))
+    fork_seconds = time.time() - started
+
+    started = time.time()
+    batched = {}
+    server = subprocess.Popen(command + ['--serve'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+    for i in range(0, len(hosts), args.batch_size):
+        server.stdin.write((' '.join(hosts[i:i + args.batch_size]) + '\n').encode('utf-8'))
+        server.stdin.flush()
+        batched.update(json.loads(server.stdout.readline().decode('utf-8')))
+    server.stdin.close()
+    server.wait()
+    batch_seconds = time.time() - started
+
+    if forked != batched:
+        sys.exit('--host and --serve disagree on host variables')
+    print(json.dumps({'hosts': len(hosts),
+                      'batch_size': args.batch_size,
+                      'fork_per_host_seconds': fork_seconds,
+                      'fork_per_host_mean_seconds': fork_seconds / (len(hosts) or 1),
+                      'batched_seconds': batch_seconds,
+                      'batched_mean_seconds': batch_seconds / (len(hosts) or 1),
+                      'speedup': fork_seconds / batch_seconds if batch_seconds else None},
+                     sort_keys=True, indent=4))
+
+
 def load_inventory():
-    args = parse_args()
-    if args.requested_host:
-        print(dumps(hostvars.get(args.requested_host, {})))
-    elif args.list_instances:
-        print(dumps(inventory))
+    lean = request()
+    if lean:
+        requested_host = lean[1]
+        timing_file = os.environ.get('DYN_INVENTORY_TIMING_FILE')
+        inventory = SyntheticInventory(**dict(FIXTURE, **env_parameters()))
+    else:
+        args = parse_args()
+        requested_host, timing_file = args.requested_host, args.timing_file
+        inventory = from_args(args, **FIXTURE)
+        if args.benchmark:
+            return benchmark(inventory, args)
+        if args.serve:
+            return serve(inventory, timing_file)
+    if requested_host:
+        print(dumps(inventory.host_vars(requested_host)))
+        record(timing_file, 'host', 1, STARTED)
     else:
-        print({})
+        inventory.write(sys.stdout, meta=False)
+        record(timing_file, 'list', None, STARTED)
 
 
 if __name__ == '__main__':
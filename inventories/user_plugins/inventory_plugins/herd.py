@@ -0,0 +1,182 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+    inventory: herd
+    version_added: "2.8"
+    short_description: A large, cached herd of cows that changes one revision at a time
+    description:
+        - Builds C(host_count) hosts spread over C(group_count) pasture groups,
+          each with a payload of C(hostvar_bytes) characters.
+        - The source moves forward in revisions; every revision changes the
+          variables of C(changes_per_revision) hosts.
+        - With C(cache) enabled the last synced revision is kept in the
+          inventory cache, and the next parse only applies the revisions since
+          then instead of rebuilding every host. A refresh that bypasses the
+          cache (for example C(--flush-cache)) does a full sync.
+        - With C(fail_after) set the parse fails like C(fox) after that many
+          hosts were inserted, then removes every host and group it added so
+          the inventory is left as it was before.
+    extends_documentation_fragment:
+      - inventory_cache
+    options:
+        plugin:
+            description: token that ensures this is a source file for the 'herd' plugin.
+            required: True
+            choices: ['herd']
+        host_count:
+            description: Number of hosts.
+            type: int
+            default: 1000
+        group_count:
+            description: Number of pasture groups the hosts are spread over.
+            type: int
+            default: 10
+        hostvar_bytes:
+            description: Size of the C(herd_payload) variable of every host.
+            type: int
+            default: 0
+        revision:
+            description: Current revision of the source.
+            type: int
+            default: 0
+        changes_per_revision:
+            description: Hosts whose variables change in every revision.
+            type: int
+            default: 10
+        fail_after:
+            description: Fail after inserting this many hosts; 0 never fails.
+            type: int
+            default: 0
+'''
+
+EXAMPLES = r'''
+    # herd.yaml
+    plugin: herd
+    host_count: 100000
+    revision: 3
+    cache: true
+    cache_plugin: jsonfile
+    cache_connection: /tmp/herd_cache
+    cache_timeout: 3600
+'''
+
+import hashlib
+
+from ansible.errors import AnsibleParserError
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable
+
+SOURCE_OPTIONS = ('host_count', 'group_count', 'hostvar_bytes', 'changes_per_revision')
+
+
+class InventoryModule(BaseInventoryPlugin, Cacheable):
+
+    NAME = 'herd'
+
+    def verify_file(self, path):
+        return super(InventoryModule, self).verify_file(path) and path.endswith(('.yaml', '.yml'))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path)
+        self._read_config_data(path)
+        self.source = dict((option, self.get_option(option)) for option in SOURCE_OPTIONS)
+        revision = self.get_option('revision')
+
+        cache_key = self.get_cache_key(path)
+        cached = None
+        if self.get_option('cache') and cache:
+            try:
+                cached = self._cache[cache_key]
+            except KeyError:
+                pass
+
+        if cached and cached['source'] == self.source and cached['revision'] <= revision:
+            data = self.apply_revisions(cached, revision)
+        else:
+            data = self.full_sync(revision)
+
+        self.populate(data)
+        # Only store data that populated cleanly, and an unchanged revision
+        # regenerates nothing, so there is nothing to store.
+        if self.get_option('cache') and data['changed']:
+            self._cache[cache_key] = data
+
+    def host_name(self, index):
+        return 'cow-{:07d}'.format(index)
+
+    def host_vars(self, index, revision):
+        hostvars = {'herd_index': index, 'herd_revision': revision}
+        size = self.source['hostvar_bytes']
+        if size:
+            seed = hashlib.sha1('{}-{}'.format(index, revision).encode('utf-8')).hexdigest()
+            hostvars['herd_payload'] = (seed * (size // len(seed) + 1))[:size]
+        return hostvars
+
+    def changed_hosts(self, revision):
+        """Indexes of the hosts revision ``revision`` changes."""
+        count = self.source['host_count']
+        changes = min(self.source['changes_per_revision'], count)
+        start = (revision - 1) * changes
+        return [(start + i) % count for i in range(changes)]
+
+    def full_sync(self, revision):
+        last_change = {}
+        for rev in range(1, revision + 1):
+            for index in self.changed_hosts(rev):
+                last_change[index] = rev
+        groups = dict(('pasture_{}'.format(group), []) for group in range(max(1, self.source['group_count'])))
+        hostvars = {}
+        for index in range(self.source['host_count']):
+            host = self.host_name(index)
+            groups['pasture_{}'.format(index % len(groups))].append(host)
+            hostvars[host] = self.host_vars(index, last_change.get(index, 0))
+        return {'source': self.source, 'revision': revision, 'groups': groups, 'hostvars': hostvars,
+                'changed': self.source['host_count']}
+
+    def apply_revisions(self, cached, revision):
+        """Only regenerate the hosts changed since the cached revision."""
+        if cached['revision'] == revision:
+            return dict(cached, changed=0)
+        hostvars = cached['hostvars']
+        changed = set()
+        for rev in range(cached['revision'] + 1, revision + 1):
+            for index in self.changed_hosts(rev):
+                hostvars[self.host_name(index)] = self.host_vars(index, rev)
+                changed.add(index)
+        return dict(cached, revision=revision, hostvars=hostvars, changed=len(changed))
+
+    def populate(self, data):
+        """Insert every group and host, then link groups and set variables.
+
+        Groups are only linked below 'herd' once every insert succeeded, so a
+        failed parse can be rolled back by removing what it added.
+        """
+        added_groups = [group for group in ['herd'] + sorted(data['groups']) if group not in self.inventory.groups]
+        added_hosts = []
+        inserted = 0
+        fail_after = self.get_option('fail_after')
+        try:
+            for group in ['herd'] + sorted(data['groups']):
+                self.inventory.add_group(group)
+            for group, hosts in data['groups'].items():
+                for host in hosts:
+                    if host not in self.inventory.hosts:
+                        added_hosts.append(host)
+                    self.inventory.add_host(host, group=group)
+                    inserted += 1
+                    if inserted == fail_after:
+                        raise AnsibleParserError('The herd stampeded after {} hosts'.format(inserted))
+        except Exception:
+            for group in added_groups:
+                self.inventory.remove_group(self.inventory.groups[group])
+            for host in added_hosts:
+                self.inventory.remove_host(self.inventory.hosts[host])
+            raise
+
+        for group in data['groups']:
+            self.inventory.add_child('herd', group)
+        for host, hostvars in data['hostvars'].items():
+            for name, value in hostvars.items():
+                self.inventory.set_variable(host, name, value)
+        self.inventory.set_variable('herd', 'herd_revision', data['revision'])
+        self.inventory.set_variable('herd', 'herd_changed_hosts', data['changed'])
@@ -0,0 +1,125 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+
+DOCUMENTATION = '''
+---
+module: async_status_batch
+short_description: Wait for many async jobs in a single module run.
+description:
+    - Batched counterpart of looping C(async_status) with C(until) over every
+      job id. Reads all job result files in one remote execution, sleeping
+      with exponential backoff between rounds until every job has finished
+      or C(timeout) runs out.
+version_added: "2.8"
+options:
+  jids:
+    description: Async job ids, e.g. the C(ansible_job_id) of fire-and-forget tasks.
+    required: true
+  async_dir:
+    description: Directory the async job results are written to.
+    default: ~/.ansible_async
+  delay:
+    description: Seconds to sleep after the first round that finds unfinished jobs.
+    default: 0.5
+  backoff:
+    description: Factor the delay grows by after every round.
+    default: 1.5
+  max_delay:
+    description: Upper bound for the delay between rounds.
+    default: 5
+  timeout:
+    description: Seconds to wait for all jobs before failing.
+    default: 300
+  cleanup:
+    description: Remove the result file of every finished job.
+    default: false
+requirements: []
+'''
+
+EXAMPLES = '''
+- shell: "sleep {{ item }}"
+  async: 60
+  poll: 0
+  loop: [1, 2, 3]
+  register: fired
+
+- async_status_batch:
+    jids: "{{ fired.results | map(attribute='ansible_job_id') | list }}"
+    cleanup: true
+  register: jobs
+'''
+
+
+def job_status(path, jid):
+    """Same interpretation of a job file as async_status."""
+    if not os.path.exists(path):
+        return {'ansible_job_id': jid, 'finished': True, 'failed': True, 'msg': 'could not find job'}
+    try:
+        with open(path) as job_file:
+            data = json.load(job_file)
+    except ValueError:
+        # not completely written yet, so still running
+        return {'ansible_job_id': jid, 'started': True, 'finished': False}
+    if 'started' not in data:
+        data['finished'] = True
+        data['ansible_job_id'] = jid
+    elif 'finished' not in data:
+        data['finished'] = False
+    return data
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            jids=dict(type='list', required=True),
+            async_dir=dict(type='path', default='~/.ansible_async'),
+            delay=dict(type='float', default=0.5),
+            backoff=dict(type='float', default=1.5),
+            max_delay=dict(type='float', default=5),
+            timeout=dict(type='float', default=300),
+            cleanup=dict(type='bool', default=False)),
+        supports_check_mode=True)
+
+    async_dir = os.path.expanduser(module.params['async_dir'])
+    delay = module.params['delay']
+    started = time.time()
+    results = {}
+    pending = list(module.params['jids'])
+    polls = 0
+    while True:
+        polls += 1
+        still_pending = []
+        for jid in pending:
+            path = os.path.join(async_dir, jid)
+            status = job_status(path, jid)
+            if status['finished']:
+                results[jid] = status
+                if module.params['cleanup'] and os.path.exists(path) and not module.check_mode:
+                    os.unlink(path)
+            else:
+                still_pending.append(jid)
+        pending = still_pending
+        if not pending or time.time() - started + delay > module.params['timeout']:
+            break
+        time.sleep(delay)
+        delay = min(delay * module.params['backoff'], module.params['max_delay'])
+
+    ordered = [results.get(jid, {'ansible_job_id': jid, 'finished': False}) for jid in module.params['jids']]
+    failed = [r['ansible_job_id'] for r in ordered if r.get('failed') or r.get('rc', 0) != 0]
+    summary = dict(changed=any(r.get('changed') for r in ordered), results=ordered, polls=polls,
+                   elapsed=time.time() - started, finished_count=len(results), pending=pending,
+                   failed_jids=failed)
+    if pending:
+        module.fail_json(msg='{0} of {1} async jobs did not finish within {2} seconds'.format(
+            len(pending), len(ordered), module.params['timeout']), **summary)
+    module.exit_json(**summary)
+
+
+if __name__ == '__main__':
+    main()
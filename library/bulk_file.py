@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+from ansible.module_utils.basic import AnsibleModule
+
+DOCUMENTATION = '''
+---
+module: bulk_file
+short_description: Apply one file state to many paths in a single module run.
+description:
+    - Batched counterpart of a C(file) task looping over C(paths), used to
+      measure per-item module dispatch against a single remote execution.
+version_added: "2.8"
+options:
+  paths:
+    description: Paths to manage.
+    required: true
+  state:
+    description: State every path should be in.
+    choices: [directory, touch, absent]
+    default: directory
+  mode:
+    description: Permissions of every path, as for the C(file) module.
+  list_changed:
+    description: Also return the paths that changed, or would change in check
+      mode, as C(changed_paths).
+    type: bool
+    default: false
+requirements: []
+'''
+
+EXAMPLES = '''
+- bulk_file:
+    paths:
+      - /opt/test/6555b322075c3a2933b422822051c864
+      - /opt/test/c2b5e864be8064373611227c8a6c555d
+    state: directory
+    mode: 0o0700
+'''
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            paths=dict(type='list', required=True),
+            state=dict(choices=['directory', 'touch', 'absent'], default='directory'),
+            mode=dict(type='raw'),
+            list_changed=dict(type='bool', default=False)),
+        supports_check_mode=True)
+
+    state = module.params['state']
+    mode = module.params['mode']
+    changed = []
+    for path in module.params['paths']:
+        path_changed = False
+        if state == 'absent':
+            if os.path.lexists(path):
+                path_changed = True
+                if not module.check_mode:
+                    if os.path.isdir(path) and not os.path.islink(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.unlink(path)
+        elif state == 'directory':
+            if not os.path.isdir(path):
+                path_changed = True
+                if not module.check_mode:
+                    os.makedirs(path)
+        elif state == 'touch':
+            path_changed = True
+            if not module.check_mode:
+                with open(path, 'a'):
+                    os.utime(path, None)
+        if mode is not None and state != 'absent' and not module.check_mode:
+            path_changed = module.set_mode_if_different(path, mode, path_changed)
+        if path_changed:
+            changed.append(path)
+
+    result = dict(changed=bool(changed), changed_count=len(changed), path_count=len(module.params['paths']))
+    if module.params['list_changed']:
+        result['changed_paths'] = changed
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
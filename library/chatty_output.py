@@ -0,0 +1,61 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from ansible.module_utils.basic import AnsibleModule
+
+DOCUMENTATION = '''
+---
+module: chatty_output
+short_description: Return a controlled amount of stdout and result data.
+description:
+    - Return C(lines) lines of stdout, each C(line_length) characters long,
+      and a C(payload) string of C(result_bytes) characters.
+    - Output is deterministic, so runs with the same options produce the
+      same events.
+version_added: "2.8"
+options:
+  lines:
+    description: Number of stdout lines.
+    default: 1
+  line_length:
+    description: Characters per stdout line, including the line number prefix.
+    default: 80
+  result_bytes:
+    description: Size of the C(payload) result string.
+    default: 0
+requirements: []
+'''
+
+EXAMPLES = '''
+# 1000 lines of 200 characters and a 1 MB payload
+- chatty_output:
+    lines: 1000
+    line_length: 200
+    result_bytes: 1048576
+  register: chatter
+'''
+
+FILLER = 'All work and no play makes Jack a dull boy. '
+
+
+def fill(length):
+    return (FILLER * (length // len(FILLER) + 1))[:length]
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            lines=dict(type='int', default=1),
+            line_length=dict(type='int', default=80),
+            result_bytes=dict(type='int', default=0)),
+        supports_check_mode=True)
+
+    lines = module.params['lines']
+    line_length = module.params['line_length']
+    body = fill(max(line_length - 9, 0))
+    stdout = '\n'.join('{0:08d} {1}'.format(i, body)[:line_length] for i in range(lines))
+    module.exit_json(changed=False, stdout=stdout, payload=fill(module.params['result_bytes']))
+
+
+if __name__ == '__main__':
+    main()
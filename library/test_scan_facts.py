@@ -1,18 +1,44 @@
-#!/usr/bin/env python
+#!/usr/bin/python
 # -*- coding: utf-8 -*-
 
 import os
+import random
 
 from ansible.module_utils.basic import * # noqa
 
+try:
+    unichr
+except NameError:
+    unichr = chr
+
 DOCUMENTATION = '''
 ---
 module: scan_facts
 short_description: Return sample facts into facts namespace.
 description:
     - Return sample facts into facts namespace.
+    - Optionally also return a generated C(scan_payload) fact of configurable
+      size and shape, deterministic for a given C(seed).
 version_added: "2.3"
 options:
+  seed:
+    description: Seed for the generated payload.
+    default: 0
+  width:
+    description: Number of keys in every generated object. C(0) disables the payload.
+    default: 0
+  depth:
+    description: Levels of nested objects below C(scan_payload).
+    default: 1
+  list_length:
+    description: Length of the list at every leaf; C(0) makes leaves plain values.
+    default: 0
+  string_length:
+    description: Length of every generated string.
+    default: 16
+  unicode:
+    description: Draw strings from CJK and Hangul code points, like C(unicode_string).
+    default: false
 requirements: []
 author: Chris Meyers, Christopher Wang
 '''
@@ -42,11 +68,76 @@ EXAMPLES = '''
     },
     "changed": false
 }
+
+# 10 keys per object, 3 levels deep, 100 unicode strings per leaf
+- test_scan_facts:
+    width: 10
+    depth: 3
+    list_length: 100
+    unicode: true
 '''
 
+UNICODE_RANGES = ((0x4E00, 0x9FFF), (0xAC00, 0xD7A3), (0xA000, 0xA48C))
+ASCII = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+
+class PayloadGenerator(object):
+    """Builds the payload in place from one seeded character pool.
+
+    Every string is a slice of the pool, so generation costs one pass over
+    the output instead of one random draw per character.
+    """
+
+    def __init__(self, seed, width, depth, list_length, string_length, unicode):
+        self.random = random.Random(seed)
+        self.width = width
+        self.depth = depth
+        self.list_length = list_length
+        self.string_length = string_length
+        if unicode:
+            ranges = [self.random.choice(UNICODE_RANGES) for i in range(string_length * 2)]
+            self.pool = u''.join(unichr(self.random.randint(low, high)) for low, high in ranges)
+        else:
+            self.pool = u''.join(self.random.choice(ASCII) for i in range(string_length * 2))
+
+    def string(self):
+        start = self.random.randint(0, self.string_length)
+        return self.pool[start:start + self.string_length]
+
+    def value(self, index):
+        kind = index % 8
+        if kind == 1:
+            return self.random.randint(0, 2 ** 31)
+        if kind == 2:
+            return self.random.random()
+        if kind == 3:
+            return bool(self.random.getrandbits(1))
+        if kind == 4:
+            return None
+        return self.string()
+
+    def leaf(self, index):
+        if not self.list_length:
+            return self.value(index)
+        return [self.value(i) for i in range(self.list_length)]
+
+    def build(self, depth=None):
+        depth = self.depth if depth is None else depth
+        obj = {}
+        for i in range(self.width):
+            key = 'key_{0}'.format(i)
+            obj[key] = self.build(depth - 1) if depth > 1 else self.leaf(i)
+        return obj
+
 def main():
     module = AnsibleModule(
-        argument_spec = dict())
+        argument_spec = dict(
+            seed=dict(type='int', default=0),
+            width=dict(type='int', default=0),
+            depth=dict(type='int', default=1),
+            list_length=dict(type='int', default=0),
+            string_length=dict(type='int', default=16),
+            unicode=dict(type='bool', default=False)))
 
     string="abc"
     unicode_string="鵟犭酜귃ꔀꈛ竳䙭韽ࠔ"
@@ -67,6 +158,8 @@ def main():
 
     results = dict(ansible_facts=dict(string=string, unicode_string=unicode_string, int=int, float=float, bool=bool,
                                       null=null, list=list, obj=obj, empty_list=empty_list, empty_obj=empty_obj))
+    if module.params['width'] > 0:
+        results['ansible_facts']['scan_payload'] = PayloadGenerator(**module.params).build()
     module.exit_json(**results)
 
 main()
@@ -0,0 +1,456 @@
+#!/usr/bin/env python
+"""A local, in-memory stand-in for the Tower/AWX v2 API.
+
+Enough of /api/v2/ for the tower modules to create, look up, update and
+delete objects offline: token login, list endpoints with field, or__ and
+page filters, detail endpoints and empty related lists.  It starts out with
+the Default organization and the Demo objects of a fresh install.
+
+Job templates can be launched and their jobs cancelled.  A job waits
+--queue-seconds, then for one of --capacity running slots, then runs for
+--run-seconds plus up to --run-jitter more and fails with --fail-ratio
+probability.  Jobs take free slots in launch order, and a cancelled job
+gives its slot back at once; all of it is worked out lazily whenever a job
+is read.
+
+Lookups by exact name go through an index on name and scope rather than a
+scan of every object.
+
+    stub_api.py --port 8013 --latency 0.005 --jitter 0.005 --capacity 10 --run-seconds 2
+
+Every request is timed; the stub endpoints report and reset the timings:
+
+    GET  /_stub/stats/      latency percentiles per method and resource
+    POST /_stub/reset/      forget the timings so far
+    POST /_stub/shutdown/   stop the server
+"""
+from argparse import ArgumentParser
+from collections import deque, OrderedDict
+from datetime import datetime, timedelta, tzinfo
+import heapq
+import json
+import random
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl, urlencode, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import urlencode
+    from urlparse import parse_qsl, urlparse
+
+try:
+    from datetime import timezone
+    UTC = timezone.utc
+except ImportError:
+    class _UTC(tzinfo):
+        def utcoffset(self, dt):
+            return timedelta(0)
+
+        def tzname(self, dt):
+            return 'UTC'
+
+        def dst(self, dt):
+            return timedelta(0)
+
+    UTC = _UTC()
+
+API = '/api/v2/'
+
+TYPES = {'inventories': 'inventory', 'users': 'user'}
+
+NAME_FIELDS = {'users': 'username'}
+
+# Names only have to be unique within these fields.
+SCOPES = {'hosts': 'inventory', 'groups': 'inventory', 'inventory_sources': 'inventory'}
+
+PERCENTILES = (50, 90, 95, 99)
+
+FINISHED = ('successful', 'failed', 'canceled')
+
+
+def timestamp(epoch):
+    return None if epoch is None else datetime.fromtimestamp(epoch, UTC).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def summarize(seconds):
+    ordered = sorted(seconds)
+    summary = {'count': len(ordered),
+               'mean': sum(ordered) / len(ordered) if ordered else None,
+               'max': ordered[-1] if ordered else None}
+    for pct in PERCENTILES:
+        summary['p{}'.format(pct)] = percentile(ordered, pct)
+    return summary
+
+
+class Store(object):
+
+    def __init__(self, queue_seconds=0.0, run_seconds=1.0, run_jitter=0.0, capacity=0, fail_ratio=0.0):
+        self.lock = threading.Lock()
+        self.objects = {}
+        # resource -> name -> str(scope) -> id -> item, for exact name lookups.
+        self.names = {}
+        self.next_id = 1
+        self.timings = []
+        self.started = time.time()
+        self.queue_seconds = queue_seconds
+        self.run_seconds = run_seconds
+        self.run_jitter = run_jitter
+        self.fail_ratio = fail_ratio
+        self.capacity = capacity
+        # Jobs in launch order that have not got a running slot yet, and
+        # (time the slot frees up, job id) of every slot in use.
+        self.pending = deque()
+        self.running = []
+        self.schedule = {}
+        organization = self.create('organizations', {'name': 'Default'})
+        inventory = self.create('inventories', {'name': 'Demo Inventory', 'organization': organization['id']})
+        self.create('hosts', {'name': 'localhost', 'inventory': inventory['id']})
+        self.create('credentials', {'name': 'Demo Credential', 'organization': organization['id']})
+        project = self.create('projects', {'name': 'Demo Project', 'organization': organization['id'],
+                                           'status': 'successful'})
+        self.create('job_templates', {'name': 'Demo Job Template', 'project': project['id'],
+                                      'inventory': inventory['id'], 'playbook': 'hello_world.yml',
+                                      'job_type': 'run'})
+
+    def collection(self, resource):
+        return self.objects.setdefault(resource, OrderedDict())
+
+    def name_field(self, resource):
+        return NAME_FIELDS.get(resource, 'name')
+
+    def scope_field(self, resource):
+        return SCOPES.get(resource, 'organization')
+
+    def index(self, resource, item):
+        names = self.names.setdefault(resource, {})
+        scopes = names.setdefault(str(item.get(self.name_field(resource))), {})
+        scopes.setdefault(str(item.get(self.scope_field(resource))), OrderedDict())[item['id']] = item
+
+    def unindex(self, resource, item):
+        scopes = self.names.get(resource, {}).get(str(item.get(self.name_field(resource))), {})
+        scopes.get(str(item.get(self.scope_field(resource))), {}).pop(item['id'], None)
+
+    def named(self, resource, name, scope=None):
+        """Items of ``resource`` called ``name``, within ``scope`` if given."""
+        scopes = self.names.get(resource, {}).get(name, {})
+        if scope is not None:
+            return list(scopes.get(scope, {}).values())
+        return sorted((item for items in scopes.values() for item in items.values()), key=lambda item: item['id'])
+
+    def create(self, resource, data):
+        now = timestamp(time.time())
+        item = dict(data, id=self.next_id, type=TYPES.get(resource, resource.rstrip('s')),
+                    url='{}{}/{}/'.format(API, resource, self.next_id), created=now, modified=now,
+                    related={}, summary_fields={})
+        if resource == 'projects':
+            item['summary_fields'] = {'last_update': {'status': 'successful'}}
+        elif resource == 'job_templates':
+            item['related'] = {'launch': '{}launch/'.format(item['url'])}
+        elif resource == 'jobs':
+            item['related'] = {'cancel': '{}cancel/'.format(item['url'])}
+        self.collection(resource)[item['id']] = item
+        self.index(resource, item)
+        self.next_id += 1
+        return item
+
+    def update(self, resource, item, data):
+        self.unindex(resource, item)
+        item.update(data, modified=timestamp(time.time()))
+        self.index(resource, item)
+
+    def delete(self, resource, item):
+        self.unindex(resource, item)
+        del self.collection(resource)[item['id']]
+
+    def conflict(self, resource, data, exclude=None):
+        for item in self.named(resource, str(data.get(self.name_field(resource))),
+                               str(data.get(self.scope_field(resource)))):
+            if item['id'] != exclude:
+                return item
+        return None
+
+    def find(self, resource, filters):
+        """Items matching ``filters``, through the name index when they name one."""
+        name_field = self.name_field(resource)
+        names = [value for key, value in filters if key == name_field]
+        if names:
+            scopes = [value for key, value in filters if key == self.scope_field(resource)]
+            candidates = self.named(resource, names[0], scopes[0] if scopes else None)
+        else:
+            candidates = self.collection(resource).values()
+        return [item for item in candidates if self.matches(item, filters)]
+
+    def matches(self, item, filters):
+        alternatives = [(key[4:], value) for key, value in filters if key.startswith('or__')]
+        if alternatives and not any(self.match(item, key, value) for key, value in alternatives):
+            return False
+        return all(self.match(item, key, value) for key, value in filters if not key.startswith('or__'))
+
+    def match(self, item, key, value):
+        if key.endswith('__in'):
+            return str(item.get(key[:-4])) in value.split(',')
+        return str(item.get(key)) == value
+
+    def launch(self, template):
+        now = time.time()
+        job = self.create('jobs', {'name': template['name'], 'job_template': template['id'],
+                                   'launch_type': 'manual', 'status': 'pending', 'failed': False,
+                                   'started': None, 'finished': None, 'elapsed': 0.0})
+        self.schedule[job['id']] = {'created': now, 'ready': now + self.queue_seconds, 'start': None,
+                                    'finish': None,
+                                    'seconds': self.run_seconds + random.random() * self.run_jitter,
+                                    'fails': random.random() < self.fail_ratio}
+        self.pending.append(job['id'])
+        return job
+
+    def advance(self, now):
+        """Start pending jobs, in launch order, as slots free up until ``now``."""
+        while self.pending:
+            plan = self.schedule[self.pending[0]]
+            start = plan['ready']
+            full = self.capacity and len(self.running) >= self.capacity
+            if full:
+                start = max(start, self.running[0][0])
+            if start > now:
+                break
+            if full:
+                heapq.heappop(self.running)
+            job_id = self.pending.popleft()
+            plan.update(start=start, finish=start + plan['seconds'])
+            if self.capacity:
+                heapq.heappush(self.running, (plan['finish'], job_id))
+
+    def refresh(self, job):
+        """Move a job through pending, waiting, running and its final status by now."""
+        if job['status'] in FINISHED:
+            return job
+        now = time.time()
+        self.advance(now)
+        plan = self.schedule[job['id']]
+        if plan['start'] is None:
+            if now >= plan['ready']:
+                job.update(status='waiting')
+        elif now >= plan['finish']:
+            job.update(status='failed' if plan['fails'] else 'successful', failed=plan['fails'],
+                       started=timestamp(plan['start']), finished=timestamp(plan['finish']),
+                       elapsed=round(plan['finish'] - plan['start'], 3))
+        else:
+            job.update(status='running', started=timestamp(plan['start']), elapsed=round(now - plan['start'], 3))
+        return job
+
+    def cancel(self, job):
+        self.refresh(job)
+        if job['status'] in FINISHED:
+            return False
+        now = time.time()
+        plan = self.schedule[job['id']]
+        if plan['start'] is None:
+            self.pending.remove(job['id'])
+        elif self.capacity:
+            # The slot frees up now rather than when the job would have finished.
+            self.running = [(now, job_id) if job_id == job['id'] else (free, job_id)
+                            for free, job_id in self.running]
+            heapq.heapify(self.running)
+        job.update(status='canceled', failed=True, started=timestamp(plan['start']),
+                   finished=timestamp(now), elapsed=round(now - plan['start'], 3) if plan['start'] else 0.0)
+        return True
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    store = None
+    latency = 0.0
+    jitter = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status, body=None):
+        payload = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('X-API-Product-Name', 'AWX')
+        self.send_header('X-API-Product-Version', 'stub')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length).decode('utf-8')) if length else {}
+
+    def handle_request(self, method):
+        started = time.time()
+        url = urlparse(self.path)
+        if url.path.startswith('/_stub/'):
+            return self.stub(method, url.path)
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.random() * self.jitter)
+        resource = '-'
+        with self.store.lock:
+            if url.path.startswith(API):
+                parts = [part for part in url.path[len(API):].split('/') if part]
+                resource = parts[0] if parts else '-'
+                status, body = self.api(method, parts, url, self.body() if method in ('POST', 'PATCH', 'PUT') else {})
+            else:
+                status, body = 404, {'detail': 'Not found.'}
+            self.store.timings.append((method, resource, time.time() - started))
+        self.respond(status, body)
+
+    def api(self, method, parts, url, data):
+        store = self.store
+        if not parts:
+            return 200, {'ping': API + 'ping/'}
+        resource = parts[0]
+        if resource == 'tokens':
+            if method == 'POST':
+                return 201, {'id': store.next_id, 'token': 'stub-token-{}'.format(store.next_id)}
+            return 204, None
+        if resource == 'ping':
+            return 200, {'ha': False, 'version': 'stub', 'active_node': 'localhost', 'instances': []}
+        if resource == 'config':
+            return 200, {'version': 'stub', 'license_info': {}}
+        if resource == 'me':
+            return 200, {'count': 1, 'next': None, 'previous': None,
+                         'results': [{'id': 1, 'type': 'user', 'username': 'admin', 'is_superuser': True}]}
+
+        items = store.collection(resource)
+        if resource == 'jobs':
+            store.advance(time.time())
+            for job in items.values():
+                store.refresh(job)
+        if len(parts) == 1:
+            if method == 'GET':
+                return 200, self.page(resource, url)
+            if method == 'POST':
+                if store.conflict(resource, data):
+                    return 400, {'__all__': ['{} with this Name already exists.'.format(resource)]}
+                return 201, store.create(resource, data)
+            return 405, {'detail': 'Method "{}" not allowed.'.format(method)}
+
+        item = items.get(int(parts[1])) if parts[1].isdigit() else None
+        if item is None:
+            return 404, {'detail': 'Not found.'}
+        if parts[2:] == ['launch'] and resource == 'job_templates':
+            if method == 'GET':
+                return 200, {'can_start_without_user_input': True, 'variables_needed_to_start': [],
+                             'ask_inventory_on_launch': False, 'ask_credential_on_launch': False}
+            job = store.launch(item)
+            return 201, dict(job, job=job['id'])
+        if parts[2:] == ['cancel'] and resource == 'jobs':
+            if method == 'GET':
+                return 200, {'can_cancel': item['status'] not in FINISHED}
+            return (202, None) if store.cancel(item) else (405, {'error': 'Job is not running.'})
+        if len(parts) > 2:
+            # Related lists (credentials, labels, ...) are always empty and
+            # accept every association.
+            if method == 'GET':
+                return 200, {'count': 0, 'next': None, 'previous': None, 'results': []}
+            return 204, None
+        if method == 'GET':
+            return 200, item
+        if method in ('PATCH', 'PUT'):
+            if store.conflict(resource, dict(item, **data), exclude=item['id']):
+                return 400, {'__all__': ['{} with this Name already exists.'.format(resource)]}
+            store.update(resource, item, data)
+            return 200, item
+        if method == 'DELETE':
+            store.delete(resource, item)
+            return 204, None
+        return 405, {'detail': 'Method "{}" not allowed.'.format(method)}
+
+    def page(self, resource, url):
+        query = parse_qsl(url.query)
+        filters = [(key, value) for key, value in query if key not in ('page', 'page_size', 'order_by')]
+        params = dict(query)
+        page = int(params.get('page', 1))
+        page_size = int(params.get('page_size', 25))
+        results = self.store.find(resource, filters)
+        window = results[(page - 1) * page_size:page * page_size]
+        next_page = None
+        if page * page_size < len(results):
+            next_page = '{}?{}'.format(url.path, urlencode(dict(params, page=page + 1)))
+        return {'count': len(results), 'next': next_page, 'previous': None, 'results': window}
+
+    def stub(self, method, path):
+        if path == '/_stub/stats/':
+            with self.store.lock:
+                timings = list(self.store.timings)
+                elapsed = time.time() - self.store.started
+            by_request = {}
+            for request_method, resource, seconds in timings:
+                by_request.setdefault('{} {}'.format(request_method, resource), []).append(seconds)
+            return self.respond(200, {'requests': len(timings), 'seconds': elapsed,
+                                      'throughput': len(timings) / elapsed if elapsed else None,
+                                      'latency': summarize([seconds for _, _, seconds in timings]),
+                                      'by_request': dict((key, summarize(value))
+                                                         for key, value in sorted(by_request.items()))})
+        if path == '/_stub/reset/' and method == 'POST':
+            with self.store.lock:
+                self.store.timings = []
+                self.store.started = time.time()
+            return self.respond(204)
+        if path == '/_stub/shutdown/' and method == 'POST':
+            self.respond(204)
+            threading.Thread(target=self.server.shutdown).start()
+            return None
+        return self.respond(404, {'detail': 'Not found.'})
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PATCH(self):
+        self.handle_request('PATCH')
+
+    def do_PUT(self):
+        self.handle_request('PUT')
+
+    def do_DELETE(self):
+        self.handle_request('DELETE')
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8013, help='Port to listen on (default: 8013)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every API request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many more random seconds')
+    parser.add_argument('--queue-seconds', type=float, default=0.0, help='Seconds a job is pending (default: 0)')
+    parser.add_argument('--run-seconds', type=float, default=1.0, help='Seconds a job runs (default: 1)')
+    parser.add_argument('--run-jitter', type=float, default=0.0, help='Up to this many more seconds a job runs')
+    parser.add_argument('--capacity', type=int, default=0, help='Jobs running at once, 0 for unlimited (default: 0)')
+    parser.add_argument('--fail-ratio', type=float, default=0.0, help='Share of jobs that fail (default: 0)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    StubHandler.store = Store(args.queue_seconds, args.run_seconds, args.run_jitter, args.capacity,
+                              args.fail_ratio)
+    StubHandler.latency = args.latency
+    StubHandler.jitter = args.jitter
+    StubServer((args.host, args.port), StubHandler).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
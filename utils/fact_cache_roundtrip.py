@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""Run fact_cache_roundtrip.yml cache-cold, then cache-warm, and compare them.
+
+The fact cache is a jsonfile cache in <output-dir>/cache, emptied before the
+cold run, with smart gathering so the warm run only gathers hosts it has no
+cached facts for.  The cold run's cache write is also checked against the
+cache files: how many were last written while the cacheable set_fact ran,
+and when the last of them was.  Both run summaries and the comparison go to
+<output-dir>/summary.jsonl and the playbook output to <output-dir>/<run>.log:
+
+    utils/fact_cache_roundtrip.py --hosts 200 --bytes 262144 --subset '!all,min'
+"""
+from argparse import ArgumentParser
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+PLAYBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'fact_cache_roundtrip.yml')
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=10, help='Hosts (default: 10)')
+    parser.add_argument('--bytes', type=int, default=65536, help='Cacheable payload per host (default: 65536)')
+    parser.add_argument('--keys', type=int, default=16, help='Keys the payload is split over (default: 16)')
+    parser.add_argument('--subset', default='!all,min', help='gather_subset (default: !all,min)')
+    parser.add_argument('--forks', type=int, default=5, help='Forks (default: 5)')
+    parser.add_argument('--output-dir', default='fact_cache_roundtrip',
+                        help='Directory for the cache and the timings (default: fact_cache_roundtrip)')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='ansible-playbook executable')
+    return parser.parse_args()
+
+
+def run(args, name, report):
+    env = dict(os.environ,
+               ANSIBLE_GATHERING='smart',
+               ANSIBLE_CACHE_PLUGIN='jsonfile',
+               ANSIBLE_CACHE_PLUGIN_CONNECTION=os.path.abspath(os.path.join(args.output_dir, 'cache')))
+    extra_vars = {'fact_hosts': args.hosts,
+                  'fact_cache_bytes': args.bytes,
+                  'fact_cache_keys': args.keys,
+                  'fact_cache_subset': args.subset.split(','),
+                  'fact_cache_report_file': os.path.abspath(report)}
+    command = [args.ansible_playbook, '-i', 'localhost,', PLAYBOOK, '-f', str(args.forks),
+               '-e', json.dumps(extra_vars)]
+    started = time.time()
+    with open(os.path.join(args.output_dir, name + '.log'), 'w') as log:
+        rc = subprocess.call(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+    summary = {'run': name, 'rc': rc, 'wall_seconds': time.time() - started}
+    if os.path.exists(report):
+        with open(report) as lines:
+            summary.update(json.loads(lines.read().splitlines()[-1]))
+        os.unlink(report)
+    return summary
+
+
+def cache_writes(cache, summary):
+    """Cache files written while the cacheable set_fact ran, and the last write."""
+    if summary.get('write_start') is None:
+        return {'cache_files_written': 0, 'cache_last_write_seconds': None}
+    mtimes = [os.path.getmtime(os.path.join(cache, name)) for name in os.listdir(cache)]
+    written = [mtime for mtime in mtimes if summary['write_start'] <= mtime <= summary['write_end']]
+    return {'cache_files_written': len(written),
+            'cache_last_write_seconds': max(written) - summary['write_start'] if written else None}
+
+
+def main():
+    args = parse_args()
+    cache = os.path.join(args.output_dir, 'cache')
+    if os.path.isdir(cache):
+        shutil.rmtree(cache)
+    os.makedirs(cache)
+    report = os.path.join(args.output_dir, 'run.jsonl')
+    cold = run(args, 'cold', report)
+    writes = cache_writes(cache, cold)
+    warm = run(args, 'warm', report)
+    comparison = {'run': 'comparison',
+                  'gather_seconds_saved': cold.get('gather_seconds', 0) - warm.get('gather_seconds', 0),
+                  'cache_write_seconds': cold.get('write_seconds'),
+                  'cache_read_seconds': warm.get('read_seconds', 0) - cold.get('read_seconds', 0),
+                  'wall_seconds_saved': cold['wall_seconds'] - warm['wall_seconds'],
+                  'cache_bytes': sum(os.path.getsize(os.path.join(cache, name)) for name in os.listdir(cache))}
+    comparison.update(writes)
+    with open(os.path.join(args.output_dir, 'summary.jsonl'), 'a') as summaries:
+        for summary in (cold, warm, comparison):
+            summaries.write(json.dumps(summary, sort_keys=True) + '\n')
+            sys.stdout.write(json.dumps(summary, sort_keys=True) + '\n')
+    if cold['rc'] or warm['rc'] or warm.get('cache') != 'warm':
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
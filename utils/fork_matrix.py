@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Sweep fork_overhead.yml over hosts, forks, tasks, strategies and modules.
+
+fork_overhead.yml renders one static playbook per task count and module into
+<output-dir>, and every combination runs it once on localhost with the
+task_timing callback.  Its records go to <output-dir>/<combination>.jsonl and
+one summary line per run is appended to <output-dir>/summary.jsonl and
+printed.  The playbook output goes to <output-dir>/<combination>.log:
+
+    utils/fork_matrix.py --hosts 1,10,50 --forks 1,5,25 --tasks 20 \\
+        --strategies linear,free --modules ping,set_fact
+"""
+from argparse import ArgumentParser
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+PLAYBOOK = os.path.join(ROOT, 'fork_overhead.yml')
+RUN_PLAY = 'Run the fork tasks'
+
+
+def int_list(value):
+    return [int(v) for v in value.split(',')]
+
+
+def str_list(value):
+    return value.split(',')
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int_list, default=[1, 10], help='Host counts (default: 1,10)')
+    parser.add_argument('--forks', type=int_list, default=[1, 5], help='Fork counts (default: 1,5)')
+    parser.add_argument('--tasks', type=int_list, default=[20], help='Task counts (default: 20)')
+    parser.add_argument('--strategies', type=str_list, default=['linear', 'free'],
+                        help='Strategies (default: linear,free)')
+    parser.add_argument('--modules', type=str_list, default=['ping', 'set_fact'],
+                        help='Task modules (default: ping,set_fact)')
+    parser.add_argument('--output-dir', default='fork_matrix', help='Directory for the timings (default: fork_matrix)')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='ansible-playbook executable')
+    return parser.parse_args()
+
+
+def summarize(records):
+    fork_tasks = [r for r in records if r['type'] == 'task' and r['play'] == RUN_PLAY]
+    host_tasks = [r for r in records if r['type'] == 'host_task' and r['play'] == RUN_PLAY]
+    start = min(r['start'] for r in host_tasks) if host_tasks else None
+    end = max(r['end'] for r in host_tasks) if host_tasks else None
+    playbook = [r for r in records if r['type'] == 'playbook']
+    return {'playbook_seconds': playbook[-1]['seconds'] if playbook else None,
+            'task_phase_seconds': end - start if host_tasks else None,
+            'task_seconds_mean': sum(r['seconds'] for r in fork_tasks) / len(fork_tasks) if fork_tasks else None,
+            'host_task_seconds_mean': (sum(r['seconds'] for r in host_tasks) / len(host_tasks)
+                                       if host_tasks else None),
+            'host_task_seconds_max': max(r['seconds'] for r in host_tasks) if host_tasks else None}
+
+
+def render(args, tasks, module):
+    """Render the static playbook of tasks tasks of module, once."""
+    playbook = os.path.abspath(os.path.join(args.output_dir, 'fork_overhead-tasks{}-{}.yml'.format(tasks, module)))
+    if not os.path.exists(playbook):
+        command = [args.ansible_playbook, '-i', 'localhost,', PLAYBOOK,
+                   '-e', 'fork_tasks={} fork_module={} fork_playbook={}'.format(tasks, module, playbook)]
+        with open(os.path.join(args.output_dir, 'render.log'), 'a') as log:
+            subprocess.check_call(command, stdout=log, stderr=subprocess.STDOUT)
+    return playbook
+
+
+def run(args, hosts, forks, tasks, strategy, module):
+    playbook = render(args, tasks, module)
+    name = 'hosts{}-forks{}-tasks{}-{}-{}'.format(hosts, forks, tasks, strategy, module)
+    timings = os.path.join(args.output_dir, name + '.jsonl')
+    if os.path.exists(timings):
+        os.unlink(timings)
+    env = dict(os.environ,
+               ANSIBLE_CALLBACKS_ENABLED='task_timing',
+               ANSIBLE_CALLBACK_WHITELIST='task_timing',
+               # The rendered playbook is not next to callback_plugins.
+               ANSIBLE_CALLBACK_PLUGINS=os.path.abspath(os.path.join(ROOT, 'callback_plugins')),
+               TASK_TIMING_OUTPUT_FILE=os.path.abspath(timings))
+    command = [args.ansible_playbook, '-i', 'localhost,', playbook, '-f', str(forks),
+               '-e', 'fork_hosts={} fork_strategy={}'.format(hosts, strategy)]
+    started = time.time()
+    with open(os.path.join(args.output_dir, name + '.log'), 'w') as log:
+        rc = subprocess.call(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+    summary = {'hosts': hosts, 'forks': forks, 'tasks': tasks, 'strategy': strategy, 'module': module,
+               'rc': rc, 'wall_seconds': time.time() - started, 'timings': timings}
+    if os.path.exists(timings):
+        with open(timings) as lines:
+            summary.update(summarize([json.loads(line) for line in lines]))
+    return summary
+
+
+def main():
+    args = parse_args()
+    if not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+    with open(os.path.join(args.output_dir, 'summary.jsonl'), 'a') as summaries:
+        for combination in itertools.product(args.hosts, args.forks, args.tasks, args.strategies, args.modules):
+            summary = run(args, *combination)
+            summaries.write(json.dumps(summary, sort_keys=True) + '\n')
+            summaries.flush()
+            sys.stdout.write(json.dumps(summary, sort_keys=True) + '\n')
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""Generate overlapping inventory sources for inventory_merge.yml.
+
+    utils/gen_inventory_sources.py --sources 40 --hosts-per-source 200 \\
+        --overlap 0.5 --groups 20 --output-dir /tmp/inventory_merge
+
+writes, like inventories/ with its .ini files and dyn_inventory.py scripts:
+
+    <output-dir>/sources/src_NNN.{ini,yml,py}   --sources sources, cycling through
+                                                --formats, read as one directory
+                                                inventory in name order
+    <output-dir>/merged.<format>                the merged result as one source in
+                                                the first of --formats, the
+                                                no-merge baseline
+    <output-dir>/expected.yml                   group_names and vars every host
+                                                must end up with
+
+Source s holds --hosts-per-source hosts starting at host s * step, where step
+leaves --overlap of its hosts shared with the next source.  Every source puts
+each of its hosts in its own merge_source_NNN group and in one of the --groups
+merge_group_NN groups, picked per source so that overlapping sources add
+different memberships, all children of merge_groups.  Hosts get
+merge_seen_NNN: 1 from every source and merge_last_source from the last one,
+which must win; groups get merge_owner_<group> from the last source that
+used them.
+
+Formats parse at different speeds, so compare against merged.<format> with a
+single --formats.
+"""
+from argparse import ArgumentParser
+import json
+import os
+import stat
+
+FORMATS = ('ini', 'yml', 'py')
+SCRIPT = '''#!/usr/bin/env python
+import sys
+
+sys.stdout.write({!r} if sys.argv[1:2] != ['--host'] else '{{}}')
+'''
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output-dir', default='inventory_merge', help='Output directory (default: inventory_merge)')
+    parser.add_argument('--sources', type=int, default=10, help='Inventory sources (default: 10)')
+    parser.add_argument('--hosts-per-source', type=int, default=50, help='Hosts per source (default: 50)')
+    parser.add_argument('--overlap', type=float, default=0.5,
+                        help='Share of a source\'s hosts also in the next source, 0 to 1 (default: 0.5)')
+    parser.add_argument('--groups', type=int, default=10, help='Shared merge_group_NN groups (default: 10)')
+    parser.add_argument('--formats', type=lambda value: value.split(','), default=list(FORMATS),
+                        help='Source formats to cycle through, of ini,yml,py (default: ini,yml,py)')
+    return parser.parse_args()
+
+
+class MergedSources(object):
+
+    def __init__(self, sources, hosts_per_source, overlap, groups, formats):
+        self.sources = max(1, sources)
+        self.hosts_per_source = max(1, hosts_per_source)
+        self.step = max(1, int(round(self.hosts_per_source * (1 - min(max(overlap, 0.0), 1.0)))))
+        self.groups = max(1, groups)
+        self.formats = formats
+        host_count = self.step * (self.sources - 1) + self.hosts_per_source
+        width = len(str(host_count))
+        self.hosts = ['merge_host_{:0{}d}'.format(i, width) for i in range(host_count)]
+
+    def source_name(self, s):
+        return 'src_{:03d}'.format(s)
+
+    def source(self, s):
+        """Group -> hosts, host -> vars and group -> vars of source ``s``."""
+        members = {self.source_name(s).replace('src', 'merge_source'): []}
+        host_vars = {}
+        for i in range(s * self.step, s * self.step + self.hosts_per_source):
+            host = self.hosts[i]
+            group = 'merge_group_{:02d}'.format((i + s) % self.groups)
+            members.setdefault(group, []).append(host)
+            members[self.source_name(s).replace('src', 'merge_source')].append(host)
+            host_vars[host] = {'merge_last_source': s, 'merge_seen_{:03d}'.format(s): 1}
+        group_vars = dict((group, {'merge_owner_' + group: s}) for group in members if group.startswith('merge_group'))
+        return members, host_vars, group_vars
+
+    def write_ini(self, path, members, host_vars, group_vars):
+        with open(path, 'w') as source:
+            for group in sorted(members):
+                source.write('[{}]\n'.format(group))
+                for host in members[group]:
+                    source.write(' '.join([host] + ['{}={}'.format(key, value) for key, value
+                                                    in sorted(host_vars.pop(host, {}).items())]) + '\n')
+                source.write('\n')
+            for group in sorted(group_vars):
+                source.write('[{}:vars]\n'.format(group))
+                source.writelines('{}={}\n'.format(key, value) for key, value in sorted(group_vars[group].items()))
+                source.write('\n')
+            source.write('[merge_groups:children]\n')
+            source.writelines('{}\n'.format(group) for group in sorted(members))
+
+    def write_yml(self, path, members, host_vars, group_vars):
+        children = {}
+        for group in members:
+            children[group] = {'hosts': dict((host, host_vars.pop(host, None)) for host in members[group])}
+            if group in group_vars:
+                children[group]['vars'] = group_vars[group]
+        with open(path, 'w') as source:
+            source.write('---\n' + json.dumps({'all': {'children': {'merge_groups': {'children': children}}}},
+                                              sort_keys=True, indent=1) + '\n')
+
+    def write_py(self, path, members, host_vars, group_vars):
+        data = {'merge_groups': {'children': sorted(members)}, '_meta': {'hostvars': host_vars}}
+        for group in members:
+            data[group] = {'hosts': members[group]}
+            if group in group_vars:
+                data[group]['vars'] = group_vars[group]
+        with open(path, 'w') as source:
+            source.write(SCRIPT.format(json.dumps(data, sort_keys=True)))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    def write(self, output_dir):
+        sources_dir = os.path.join(output_dir, 'sources')
+        if not os.path.isdir(sources_dir):
+            os.makedirs(sources_dir)
+        for name in os.listdir(sources_dir):
+            os.unlink(os.path.join(sources_dir, name))
+
+        merged_members = {}
+        merged_host_vars = dict((host, {}) for host in self.hosts)
+        merged_group_vars = {}
+        for s in range(self.sources):
+            members, host_vars, group_vars = self.source(s)
+            for group, hosts in members.items():
+                merged_members.setdefault(group, set()).update(hosts)
+            for host, variables in host_vars.items():
+                merged_host_vars[host].update(variables)
+            for group, variables in group_vars.items():
+                merged_group_vars.setdefault(group, {}).update(variables)
+            fmt = self.formats[s % len(self.formats)]
+            getattr(self, 'write_' + fmt)(os.path.join(sources_dir, '{}.{}'.format(self.source_name(s), fmt)),
+                                          members, host_vars, group_vars)
+
+        merged = 'merged.' + self.formats[0]
+        for name in os.listdir(output_dir):
+            if name.startswith('merged.'):
+                os.unlink(os.path.join(output_dir, name))
+        getattr(self, 'write_' + self.formats[0])(os.path.join(output_dir, merged),
+                                                  dict((group, sorted(hosts)) for group, hosts
+                                                       in merged_members.items()),
+                                                  dict(merged_host_vars), merged_group_vars)
+
+        expected = {}
+        for host in self.hosts:
+            groups = sorted(group for group, hosts in merged_members.items() if host in hosts)
+            variables = dict(merged_host_vars[host])
+            for group in groups:
+                variables.update(merged_group_vars.get(group, {}))
+            expected[host] = {'group_names': sorted(groups + ['merge_groups']), 'vars': variables}
+        with open(os.path.join(output_dir, 'expected.yml'), 'w') as expected_file:
+            expected_file.write('---\n' + json.dumps({'inventory_merge_expected': expected,
+                                                      'inventory_merge_sources': self.sources,
+                                                      'inventory_merge_merged': merged,
+                                                      'inventory_merge_host_entries': self.sources *
+                                                      self.hosts_per_source}, sort_keys=True) + '\n')
+        return merged_members
+
+
+def main():
+    args = parse_args()
+    unknown = set(args.formats) - set(FORMATS)
+    if unknown:
+        raise SystemExit('unknown formats: {}'.format(', '.join(sorted(unknown))))
+    sources = MergedSources(args.sources, args.hosts_per_source, args.overlap, args.groups, args.formats)
+    groups = sources.write(args.output_dir)
+    print(json.dumps({'sources': sources.sources,
+                      'hosts': len(sources.hosts),
+                      'host_entries': sources.sources * sources.hosts_per_source,
+                      'groups': len(groups) + 1,
+                      'inventory': os.path.join(args.output_dir, 'sources')}, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
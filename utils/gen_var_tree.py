@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""Generate a nested inventory with group_vars/host_vars trees for var_precedence.yml.
+
+    utils/gen_var_tree.py --host-count 1000 --group-count 60 --depth 4 \\
+        --var-files 5 --shared-keys 20 --output-dir /tmp/var_tree
+
+writes, like inventories/group_vars and inventories/host_vars at scale:
+
+    <output-dir>/hosts.ini                   groups nested --depth levels deep,
+                                             every host in --memberships leaf groups
+    <output-dir>/group_vars/<group>/NN.yml   --var-files files per group
+    <output-dir>/host_vars/<host>.yml        for every --host-vars-every'th host
+    <output-dir>/expected.yml                the value every host must resolve
+                                             for every shared key
+
+The --shared-keys var_tree_shared_NN keys overlap: key k is defined by most
+groups, by the first k % --var-files + 1 files of each, and, for even k, by
+host_vars.  Their value names the file that defined them, so the winner shows
+which precedence rule applied: host_vars over group_vars, deeper groups over
+their parents, groups of the same depth by name, and later files of a group
+over earlier ones.  --unique-keys more keys per file never overlap.
+"""
+from argparse import ArgumentParser
+import json
+import os
+
+LEVEL_GROUP = 'tree_{}_{:0{}d}'
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output-dir', default='var_tree', help='Inventory directory (default: var_tree)')
+    parser.add_argument('--host-count', type=int, default=100, help='Hosts (default: 100)')
+    parser.add_argument('--group-count', type=int, default=20, help='Groups over all levels (default: 20)')
+    parser.add_argument('--depth', type=int, default=3, help='Levels of group nesting (default: 3)')
+    parser.add_argument('--memberships', type=int, default=2, help='Leaf groups per host (default: 2)')
+    parser.add_argument('--var-files', type=int, default=3, help='Var files per group (default: 3)')
+    parser.add_argument('--shared-keys', type=int, default=10, help='Overlapping keys (default: 10)')
+    parser.add_argument('--unique-keys', type=int, default=5, help='Non overlapping keys per file (default: 5)')
+    parser.add_argument('--host-vars-every', type=int, default=2,
+                        help='Give every n-th host a host_vars file, 0 for none (default: 2)')
+    return parser.parse_args()
+
+
+class VarTree(object):
+
+    def __init__(self, host_count, group_count, depth, memberships, var_files, shared_keys, unique_keys,
+                 host_vars_every):
+        self.depth = max(1, min(depth, group_count))
+        self.var_files = max(1, var_files)
+        self.shared_keys = shared_keys
+        self.unique_keys = unique_keys
+        self.host_vars_every = host_vars_every
+
+        # Split the groups evenly over the levels; every group of a level is
+        # the child of a group of the level above it.
+        base, extra = divmod(group_count, self.depth)
+        self.levels = []
+        for level in range(self.depth):
+            size = base + (1 if level < extra else 0)
+            self.levels.append([LEVEL_GROUP.format(level, i, len(str(size))) for i in range(size)])
+        self.parents = {}
+        for level in range(1, self.depth):
+            above = self.levels[level - 1]
+            for i, group in enumerate(self.levels[level]):
+                self.parents[group] = above[i % len(above)]
+        self.index = dict((group, i) for level in self.levels for i, group in enumerate(level))
+
+        leaves = self.levels[-1]
+        width = len(str(host_count))
+        self.hosts = ['tree_host_{:0{}d}'.format(i, width) for i in range(host_count)]
+        self.host_groups = dict((host, sorted(set(leaves[(i + m) % len(leaves)]
+                                                  for m in range(max(1, memberships)))))
+                                for i, host in enumerate(self.hosts))
+
+    def key(self, k):
+        return 'var_tree_shared_{:02d}'.format(k)
+
+    def group_defines(self, group, k):
+        return (self.index[group] + k) % 3 != 0
+
+    def file_name(self, f):
+        return '{:02d}.yml'.format(f)
+
+    def group_files(self, group):
+        for f in range(self.var_files):
+            data = {}
+            for k in range(self.shared_keys):
+                if self.group_defines(group, k) and f <= k % self.var_files:
+                    data[self.key(k)] = '{}/{}'.format(group, self.file_name(f))
+            for u in range(self.unique_keys):
+                data['var_tree_{}_{:02d}_{:02d}'.format(group, f, u)] = f * self.unique_keys + u
+            yield self.file_name(f), data
+
+    def host_file(self, index, host):
+        if self.host_vars_every and index % self.host_vars_every == 0:
+            return dict((self.key(k), 'host_vars/{}'.format(host)) for k in range(0, self.shared_keys, 2))
+
+    def ancestors(self, group):
+        while group:
+            yield group
+            group = self.parents.get(group)
+
+    def expected(self, index, host):
+        groups = set(group for leaf in self.host_groups[host] for group in self.ancestors(group=leaf))
+        # sort_groups() order: depth, then priority, then name; later groups win.
+        ordered = sorted(groups, key=lambda group: (int(group.split('_')[1]), group))
+        host_file = self.host_file(index, host) or {}
+        values = {}
+        for k in range(self.shared_keys):
+            if self.key(k) in host_file:
+                values[self.key(k)] = host_file[self.key(k)]
+                continue
+            for group in reversed(ordered):
+                if self.group_defines(group, k):
+                    values[self.key(k)] = '{}/{}'.format(group, self.file_name(k % self.var_files))
+                    break
+        return values
+
+    def write(self, output_dir):
+        for directory in ('group_vars', 'host_vars'):
+            if not os.path.isdir(os.path.join(output_dir, directory)):
+                os.makedirs(os.path.join(output_dir, directory))
+        with open(os.path.join(output_dir, 'hosts.ini'), 'w') as hosts:
+            for leaf in self.levels[-1]:
+                hosts.write('[{}]\n'.format(leaf))
+                hosts.writelines('{}\n'.format(host) for host in self.hosts if leaf in self.host_groups[host])
+                hosts.write('\n')
+            for level in self.levels[:-1]:
+                for group in level:
+                    hosts.write('[{}:children]\n'.format(group))
+                    hosts.writelines('{}\n'.format(child) for child, parent in sorted(self.parents.items())
+                                     if parent == group)
+                    hosts.write('\n')
+        with open(os.path.join(output_dir, 'group_vars', 'all.yml'), 'w') as all_vars:
+            all_vars.write('---\nansible_connection: local\n')
+        for level in self.levels:
+            for group in level:
+                group_dir = os.path.join(output_dir, 'group_vars', group)
+                if not os.path.isdir(group_dir):
+                    os.makedirs(group_dir)
+                for name, data in self.group_files(group):
+                    with open(os.path.join(group_dir, name), 'w') as var_file:
+                        var_file.write('---\n' + json.dumps(data, sort_keys=True, indent=2) + '\n')
+        expected = {}
+        for index, host in enumerate(self.hosts):
+            host_file = self.host_file(index, host)
+            if host_file:
+                with open(os.path.join(output_dir, 'host_vars', host + '.yml'), 'w') as var_file:
+                    var_file.write('---\n' + json.dumps(host_file, sort_keys=True, indent=2) + '\n')
+            expected[host] = self.expected(index, host)
+        with open(os.path.join(output_dir, 'expected.yml'), 'w') as expected_file:
+            expected_file.write('---\n' + json.dumps({'var_tree_expected': expected}, sort_keys=True) + '\n')
+
+
+def main():
+    args = parse_args()
+    tree = VarTree(args.host_count, args.group_count, args.depth, args.memberships, args.var_files,
+                   args.shared_keys, args.unique_keys, args.host_vars_every)
+    tree.write(args.output_dir)
+    print(json.dumps({'hosts': len(tree.hosts),
+                      'groups': sum(len(level) for level in tree.levels),
+                      'levels': [len(level) for level in tree.levels],
+                      'var_files': sum(len(level) for level in tree.levels) * tree.var_files,
+                      'inventory': os.path.join(args.output_dir, 'hosts.ini')}, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""Generate vaulted variables spread over many vault ids and time decrypting them.
+
+    utils/gen_vault_vars.py --vars 2000 --vault-ids 20 --output-dir /tmp/vault_bench
+
+writes, like utils/multivault-dotted-vars.yml with dotted vault ids:
+
+    <output-dir>/vault_vars.yml           vault_bench_var_NNNNN: !vault ... (ids bench.0, bench.1, ...)
+    <output-dir>/passwords/<vault id>     the password of every vault id
+    <output-dir>/vault_ids                the matching --vault-id arguments
+
+for vault_benchmark.yml.  --salt per-id encrypts every value of a vault id
+with the same salt, so a derived key can be reused across those values.
+
+    utils/gen_vault_vars.py --benchmark --hosts 100 --output-dir /tmp/vault_bench
+
+decrypts the generated values once, and once per host, both deriving the key
+for every value and with a derived-key cache keyed by vault secret and salt,
+and prints the timings as JSON.
+"""
+from argparse import ArgumentParser
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from ansible.parsing.vault import VaultAES256, VaultLib, VaultSecret
+
+VAULT_VALUE = re.compile(r'^(\S+): !vault \|\n((?: +\S+\n)+)', re.MULTILINE)
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output-dir', default='vault_bench', help='Scenario directory (default: vault_bench)')
+    parser.add_argument('--vars', type=int, default=1000, help='Vaulted variables (default: 1000)')
+    parser.add_argument('--vault-ids', type=int, default=10, help='Vault ids (default: 10)')
+    parser.add_argument('--value-bytes', type=int, default=32, help='Plaintext size (default: 32)')
+    parser.add_argument('--salt', choices=['random', 'per-id'], default='random',
+                        help='Fresh salt per value, or one salt per vault id (default: random)')
+    parser.add_argument('--benchmark', action='store_true', help='Time decrypting an existing scenario')
+    parser.add_argument('--hosts', type=int, default=10, help='Hosts reusing every value in --benchmark (default: 10)')
+    return parser.parse_args()
+
+
+def vault_id(index):
+    return 'bench.{}'.format(index)
+
+
+def password(index):
+    return 'bench-secret-{}'.format(index)
+
+
+def generate(args):
+    os.makedirs(os.path.join(args.output_dir, 'passwords'), exist_ok=True)
+    secrets = [(vault_id(i), VaultSecret(password(i).encode('utf-8'))) for i in range(args.vault_ids)]
+    vault = VaultLib(secrets)
+    vault_ids = []
+    for index, (name, _) in enumerate(secrets):
+        path = os.path.abspath(os.path.join(args.output_dir, 'passwords', name))
+        with open(path, 'w') as password_file:
+            password_file.write(password(index) + '\n')
+        vault_ids.append('--vault-id {}@{}'.format(name, path))
+    with open(os.path.join(args.output_dir, 'vault_ids'), 'w') as ids_file:
+        ids_file.write(' '.join(vault_ids) + '\n')
+
+    with open(os.path.join(args.output_dir, 'vault_vars.yml'), 'w') as vars_file:
+        vars_file.write('---\n')
+        for index in range(args.vars):
+            name, secret = secrets[index % len(secrets)]
+            salt = None
+            if args.salt == 'per-id':
+                salt = hashlib.sha256(name.encode('utf-8')).hexdigest()
+            plaintext = (hashlib.sha1(str(index).encode('utf-8')).hexdigest() * (args.value_bytes // 40 + 1))
+            b_vaulttext = vault.encrypt(plaintext[:args.value_bytes], secret, vault_id=name, salt=salt)
+            lines = b_vaulttext.decode('utf-8').splitlines()
+            vars_file.write('vault_bench_var_{:05d}: !vault |\n'.format(index))
+            vars_file.write(''.join('          {}\n'.format(line) for line in lines))
+    print(' '.join(vault_ids))
+
+
+def set_key_cache(enabled):
+    """Derive the key for every value, or once per vault secret and salt."""
+    derive = VaultAES256.__dict__['_gen_key_initctr'].__func__
+    derive = getattr(derive, '__wrapped__', derive)
+    if enabled:
+        keys = {}
+
+        def cached(cls, b_password, b_salt):
+            if (b_password, b_salt) not in keys:
+                keys[(b_password, b_salt)] = derive(cls, b_password, b_salt)
+            return keys[(b_password, b_salt)]
+        VaultAES256._gen_key_initctr = classmethod(cached)
+    else:
+        VaultAES256._gen_key_initctr = classmethod(derive)
+
+
+def benchmark(args):
+    with open(os.path.join(args.output_dir, 'vault_vars.yml')) as vars_file:
+        values = [''.join(line.strip() + '\n' for line in block.splitlines())
+                  for _, block in VAULT_VALUE.findall(vars_file.read())]
+    vault_ids = set(value.split('\n', 1)[0].split(';')[3] for value in values)
+    secrets = [(name, VaultSecret(password(int(name.split('.')[1])).encode('utf-8'))) for name in sorted(vault_ids)]
+    vault = VaultLib(secrets)
+
+    original = VaultAES256.__dict__['_gen_key_initctr']
+    results = {'vars': len(values), 'vault_ids': len(vault_ids), 'hosts': args.hosts}
+    try:
+        for key_cache in (False, True):
+            for pattern, repeat in (('once', 1), ('reuse', args.hosts)):
+                set_key_cache(key_cache)
+                started = time.time()
+                for _ in range(repeat):
+                    for value in values:
+                        vault.decrypt(value)
+                label = '{}_{}'.format(pattern, 'key_cache' if key_cache else 'no_cache')
+                results[label + '_seconds'] = time.time() - started
+                results[label + '_decrypts'] = repeat * len(values)
+    finally:
+        VaultAES256._gen_key_initctr = original
+    json.dump(results, sys.stdout, sort_keys=True, indent=4)
+    sys.stdout.write('\n')
+
+
+def main():
+    args = parse_args()
+    if args.benchmark:
+        benchmark(args)
+    else:
+        generate(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""Synthetic inventory generator shared by the ``dyn_inventory.py`` scripts.
+
+Run without parameters, every script reproduces its historical fixture:
+three overlapping groups with five hosts per group combination plus five
+ungrouped hosts.  The same shape scales to arbitrarily large inventories by
+flag or environment variable:
+
+    --host-count / DYN_INVENTORY_HOST_COUNT          grouped hosts in total
+    --group-count / DYN_INVENTORY_GROUP_COUNT        number of groups
+    --overlap / DYN_INVENTORY_OVERLAP                max groups per host
+    --ungrouped-count / DYN_INVENTORY_UNGROUPED_COUNT
+    --hostvar-bytes / DYN_INVENTORY_HOSTVAR_BYTES    payload size per host
+    --cache-dir / DYN_INVENTORY_CACHE_DIR            enable the --list cache
+
+Hosts in a combination of groups are named after it, e.g.
+``group_one_two_and_three_host_01``.  ``--list`` output is streamed as JSON
+and always carries ``_meta.hostvars`` so ``--host`` is never needed; it is
+answered from the host name alone, without building the inventory.  Plain
+``--list`` and ``--host`` take the lean_inventory.py path and never import
+``argparse``.
+"""
+import json
+import os
+import sys
+
+from lean_inventory import request
+
+VERSION = 1
+
+WORDS = ('one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine')
+
+PARAMETERS = (
+    # (flag, environment variable, default)
+    ('host_count', 'DYN_INVENTORY_HOST_COUNT', None),
+    ('group_count', 'DYN_INVENTORY_GROUP_COUNT', 3),
+    ('overlap', 'DYN_INVENTORY_OVERLAP', 3),
+    ('ungrouped_count', 'DYN_INVENTORY_UNGROUPED_COUNT', 5),
+    ('hostvar_bytes', 'DYN_INVENTORY_HOSTVAR_BYTES', 0),
+)
+
+HOSTS_PER_COMBINATION = 5
+
+
+def dumps(obj):
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'))
+
+
+class SyntheticInventory(object):
+
+    def __init__(self, group_offset=0, ungrouped_start=1, all_vars=None, group_vars=None,
+                 host_count=None, group_count=3, overlap=3, ungrouped_count=5, hostvar_bytes=0):
+        self.group_offset = group_offset
+        self.ungrouped_start = ungrouped_start
+        self.all_vars = all_vars or {}
+        self.group_vars = group_vars or {}
+        self.host_count = host_count
+        self.group_count = group_count
+        self.overlap = max(1, min(overlap, group_count))
+        self.ungrouped_count = ungrouped_count
+        self.hostvar_bytes = hostvar_bytes
+
+        # A combination is a run of consecutive groups, ordered by size and
+        # then by first group, which is the order the fixtures list them in.
+        self.combinations = [tuple(range(start, start + size))
+                             for size in range(1, self.overlap + 1)
+                             for start in range(group_count - size + 1)]
+        if host_count is None:
+            self.combination_sizes = [HOSTS_PER_COMBINATION] * len(self.combinations)
+        else:
+            base, extra = divmod(host_count, len(self.combinations) or 1)
+            self.combination_sizes = [base + (1 if i < extra else 0)
+                                      for i in range(len(self.combinations))]
+        self.width = max(2, len(str(max(self.combination_sizes + [0]))))
+        self.ungrouped_width = max(2, len(str(ungrouped_start + ungrouped_count - 1)))
+        self._combination_index = None
+
+    def key(self):
+        return dumps({'version': VERSION,
+                      'group_offset': self.group_offset,
+                      'ungrouped_start': self.ungrouped_start,
+                      'all_vars': self.all_vars,
+                      'group_vars': self.group_vars,
+                      'host_count': self.host_count,
+                      'group_count': self.group_count,
+                      'overlap': self.overlap,
+                      'ungrouped_count': self.ungrouped_count,
+                      'hostvar_bytes': self.hostvar_bytes})
+
+    def group_label(self, group):
+        index = self.group_offset + group
+        return WORDS[index] if index < len(WORDS) else str(index + 1)
+
+    def group_name(self, group):
+        return 'group_{}'.format(self.group_label(group))
+
+    def combination_name(self, combination):
+        labels = [self.group_label(group) for group in combination]
+        if len(labels) > 1:
+            labels = ['_'.join(labels[:-1]) + '_and_' + labels[-1]]
+        return 'group_{}'.format(labels[0])
+
+    def combination_hosts(self, index):
+        prefix = '{}_host_'.format(self.combination_name(self.combinations[index]))
+        return ['{}{:0{}d}'.format(prefix, i, self.width)
+                for i in range(1, self.combination_sizes[index] + 1)]
+
+    def ungrouped_hosts(self):
+        return ['ungrouped_host_{:0{}d}'.format(i, self.ungrouped_width)
+                for i in range(self.ungrouped_start, self.ungrouped_start + self.ungrouped_count)]
+
+    def iter_groups(self):
+        for group in range(self.group_count):
+            hosts = []
+            for index, combination in enumerate(self.combinations):
+                if group in combination:
+                    hosts.extend(self.combination_hosts(index))
+            group_vars = {'is_in_{}'.format(self.group_name(group)): True}
+            group_vars.update(self.group_vars.get(self.group_name(group), {}))
+            yield self.group_name(group), {'hosts': hosts, 'vars': group_vars}
+        yield 'all', {'vars': self.all_vars}
+        yield 'ungrouped', {'hosts': self.ungrouped_hosts()}
+
+    def iter_hosts(self):
+        for index in range(len(self.combinations)):
+            for host in self.combination_hosts(index):
+                yield host
+        for host in self.ungrouped_hosts():
+            yield host
+
+    def marked_hosts(self):
+        """The first host of every single-group combination has its own var."""
+        return set('{}_host_{:0{}d}'.format(self.combination_name(combination), 1, self.width)
+                   for index, combination in enumerate(self.combinations)
+                   if len(combination) == 1 and self.combination_sizes[index])
+
+    def payload(self, host):
+        import hashlib
+        seed = hashlib.sha1(host.encode('utf-8')).hexdigest()
+        return (seed * (self.hostvar_bytes // len(seed) + 1))[:self.hostvar_bytes]
+
+    def iter_hostvars(self):
+        marked = self.marked_hosts()
+        if not self.hostvar_bytes:
+            for host in sorted(marked):
+                yield host, {'{}_has_this_var'.format(host): True}
+            return
+        for host in self.iter_hosts():
+            hostvars = {'payload': self.payload(host)}
+            if host in marked:
+                hostvars['{}_has_this_var'.format(host)] = True
+            yield host, hostvars
+
+    def locate(self, host):
+        """Index of the combination ``host`` belongs to, -1 if ungrouped, None if unknown."""
+        prefix, _, number = host.rpartition('_host_')
+        if not number.isdigit():
+            return None
+        if prefix == 'ungrouped':
+            first = self.ungrouped_start
+            if len(number) == self.ungrouped_width and first <= int(number) < first + self.ungrouped_count:
+                return -1
+            return None
+        if self._combination_index is None:
+            self._combination_index = dict((self.combination_name(combination), index)
+                                           for index, combination in enumerate(self.combinations))
+        index = self._combination_index.get(prefix)
+        if index is not None and len(number) == self.width and 1 <= int(number) <= self.combination_sizes[index]:
+            return index
+        return None
+
+    def host_vars(self, host):
+        index = self.locate(host)
+        if index is None:
+            return {}
+        hostvars = {}
+        if self.hostvar_bytes:
+            hostvars['payload'] = self.payload(host)
+        if index >= 0 and len(self.combinations[index]) == 1 and host.endswith('_host_{:0{}d}'.format(1, self.width)):
+            hostvars['{}_has_this_var'.format(host)] = True
+        return hostvars
+
+    def index(self):
+        return dict(self.iter_hostvars())
+
+    def write(self, stream, meta=True):
+        """Stream the --list document one group and one host at a time."""
+        separator = '{'
+        for name, group in self.iter_groups():
+            stream.write('{}{}:{}'.format(separator, dumps(name), dumps(group)))
+            separator = ','
+        if meta:
+            stream.write(',"_meta":{"hostvars":{')
+            separator = ''
+            for host, hostvars in self.iter_hostvars():
+                stream.write('{}{}:{}'.format(separator, dumps(host), dumps(hostvars)))
+                separator = ','
+            stream.write('}}')
+        stream.write('}\n')
+
+
+class _Tee(object):
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, data):
+        for stream in self.streams:
+            stream.write(data)
+
+
+def write_cached(inventory, cache_dir, stream):
+    """Serve --list from ``cache_dir`` keyed by the inventory parameters."""
+    import hashlib
+    import shutil
+    import tempfile
+    digest = hashlib.sha1(inventory.key().encode('utf-8')).hexdigest()
+    path = os.path.join(cache_dir, 'dyn_inventory-{}.json'.format(digest))
+    if os.path.exists(path):
+        with open(path) as cached:
+            shutil.copyfileobj(cached, stream)
+        return
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.dyn_inventory-')
+    try:
+        with os.fdopen(fd, 'w') as tmp:
+            inventory.write(_Tee(stream, tmp))
+        os.rename(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def build_parser():
+    from argparse import ArgumentParser
+    parser = ArgumentParser()
+    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
+                        help='List instances (default: True)')
+    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    for name, env, default in PARAMETERS:
+        parser.add_argument('--{}'.format(name.replace('_', '-')), dest=name, type=int,
+                            default=int(os.environ[env]) if os.environ.get(env) else default,
+                            help='(env: {}, default: {})'.format(env, default))
+    parser.add_argument('--cache-dir', dest='cache_dir', default=os.environ.get('DYN_INVENTORY_CACHE_DIR'),
+                        help='Cache --list output in this directory (env: DYN_INVENTORY_CACHE_DIR)')
+    return parser
+
+
+def parameter_env(args):
+    """Environment reproducing the inventory parameters of ``args``.
+
+    Children started with it take the lean path on a plain ``--list`` or
+    ``--host``, as they do when Ansible runs them.
+    """
+    env = dict(os.environ)
+    for name, variable, _ in PARAMETERS:
+        if getattr(args, name) is None:
+            env.pop(variable, None)
+        else:
+            env[variable] = str(getattr(args, name))
+    return env
+
+
+def from_args(args, **fixture):
+    return SyntheticInventory(**dict(fixture, **dict((name, getattr(args, name))
+                                                     for name, _, _ in PARAMETERS)))
+
+
+def env_parameters():
+    return dict((name, int(os.environ[env]) if os.environ.get(env) else default)
+                for name, env, default in PARAMETERS)
+
+
+def main(argv=None, **fixture):
+    lean = request(argv)
+    if lean:
+        _, requested_host = lean
+        cache_dir = os.environ.get('DYN_INVENTORY_CACHE_DIR')
+        inventory = SyntheticInventory(**dict(fixture, **env_parameters()))
+    else:
+        args = build_parser().parse_args(argv)
+        requested_host, cache_dir = args.requested_host, args.cache_dir
+        inventory = from_args(args, **fixture)
+    if requested_host:
+        sys.stdout.write(dumps(inventory.host_vars(requested_host)) + '\n')
+    elif cache_dir:
+        write_cached(inventory, cache_dir, sys.stdout)
+    else:
+        inventory.write(sys.stdout)
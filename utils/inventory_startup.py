@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""Compare the cold-start time of the inventories/ scripts against a baseline.
+
+The baseline is the inventories/ directory of another revision, by default
+the one before lean_inventory.py was added.  Every script runs --runs times
+per mode (--list, and --host with one of its hosts), alternating with its
+baseline, each in a fresh interpreter.  --list output of both must parse to
+the same inventory, ignoring current_time:
+
+    utils/inventory_startup.py --runs 20
+    utils/inventory_startup.py --baseline-rev HEAD~5 --scripts dyn_inventory.py
+"""
+from argparse import ArgumentParser
+import ast
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# (script, host to ask --host for)
+SCRIPTS = (
+    ('dyn_inventory.py', 'group_one_host_01'),
+    ('more_inventories/dyn_inventory.py', 'group_four_host_01'),
+    ('more_inventories/even_more_inventories/dyn_inventory.py', 'group_seven_host_01'),
+    ('metaless_dyn_inventory.py', 'group_one_host_01'),
+    ('dyn_inventory_test_env.py', 'localhost'),
+    ('dyn_inventory_test_two_env.py', 'localhost'),
+    ('invalid_dyn_inventory.py', 'localhost'),
+    ('for_gen_host_status.py', '1_ok'),
+)
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='Runs per script and mode (default: 10)')
+    parser.add_argument('--baseline-rev', help='Revision to compare against (default: before lean_inventory.py)')
+    parser.add_argument('--scripts', type=lambda value: value.split(','),
+                        help='Comma separated scripts relative to inventories/ (default: all)')
+    return parser.parse_args()
+
+
+def git(*args):
+    return subprocess.check_output(('git', '-C', REPO) + args).decode('utf-8').strip()
+
+
+def default_baseline():
+    # lean_inventory.py was added in inventories/ and later moved to utils/.
+    added = git('log', '--diff-filter=A', '--format=%H', '--', 'inventories/lean_inventory.py').splitlines()
+    return added[-1] + '^' if added else 'HEAD'
+
+
+def export(rev, directory):
+    # Later revisions import their helpers from utils/.
+    archive = subprocess.Popen(('git', '-C', REPO, 'archive', rev, 'inventories', 'utils'), stdout=subprocess.PIPE)
+    subprocess.check_call(('tar', '-x', '-C', directory), stdin=archive.stdout)
+    archive.wait()
+    return os.path.join(directory, 'inventories')
+
+
+def timed(script, argv):
+    started = time.time()
+    output = subprocess.check_output([sys.executable, script] + argv, cwd=os.path.dirname(script))
+    return time.time() - started, output
+
+
+def parse(output):
+    """Scripts used to print repr()s of dicts rather than JSON."""
+    text = output.decode('utf-8')
+    try:
+        return json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
+
+
+def without_time(data):
+    if isinstance(data, dict):
+        return dict((key, without_time(value)) for key, value in data.items() if key != 'current_time')
+    return data
+
+
+def stats(seconds):
+    ordered = sorted(seconds)
+    return {'min': ordered[0], 'median': ordered[len(ordered) // 2], 'mean': sum(ordered) / len(ordered)}
+
+
+def main():
+    args = parse_args()
+    baseline_rev = args.baseline_rev or default_baseline()
+    tmp = tempfile.mkdtemp(prefix='inventory_startup-')
+    try:
+        baseline_dir = export(baseline_rev, tmp)
+        current_dir = os.path.join(REPO, 'inventories')
+        for script, host in SCRIPTS:
+            if args.scripts and script not in args.scripts:
+                continue
+            for mode, argv in (('list', ['--list']), ('host', ['--host', host])):
+                times = {'baseline': [], 'current': []}
+                outputs = {}
+                for _ in range(args.runs):
+                    for name, directory in (('baseline', baseline_dir), ('current', current_dir)):
+                        seconds, outputs[name] = timed(os.path.join(directory, script), argv)
+                        times[name].append(seconds)
+                result = {'script': script, 'mode': mode, 'runs': args.runs, 'baseline_rev': baseline_rev,
+                          'baseline': stats(times['baseline']), 'current': stats(times['current'])}
+                result['speedup'] = result['baseline']['median'] / result['current']['median']
+                if mode == 'list':
+                    result['same_output'] = without_time(parse(outputs['baseline'])) == \
+                        without_time(parse(outputs['current']))
+                sys.stdout.write(json.dumps(result, sort_keys=True) + '\n')
+                sys.stdout.flush()
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Minimal ``--list``/``--host`` driver shared by the inventory scripts.
+
+Inventory scripts run once per sync, so their cost is mostly interpreter
+start and imports.  This module only imports ``json`` and ``sys``, parses
+``--list`` and ``--host`` by hand, and calls just the builder for the
+requested mode, which writes compact JSON straight to stdout:
+
+    run(lambda: {'all': ..., '_meta': ...}, host_vars=lambda host: {...})
+
+Anything else, and the scripts' own extra options, fall back to
+``argparse`` only when ``request()`` returns None, so an unknown option is
+an error rather than a ``--list``.
+"""
+import json
+import sys
+
+
+def request(argv=None):
+    """``('list', None)`` or ``('host', name)``, None if ``argv`` has other options."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv == ['--list']:
+        return 'list', None
+    if len(argv) == 2 and argv[0] == '--host':
+        return 'host', argv[1]
+    if len(argv) == 1 and argv[0].startswith('--host='):
+        return 'host', argv[0][len('--host='):]
+    return None
+
+
+def parse(argv=None):
+    """``request()`` through ``argparse``, which exits on unknown options."""
+    from argparse import ArgumentParser
+    parser = ArgumentParser()
+    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
+                        help='List instances (default: True)')
+    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    args = parser.parse_args(argv)
+    return ('host', args.requested_host) if args.requested_host else ('list', None)
+
+
+def dump(data, stream=None):
+    stream = sys.stdout if stream is None else stream
+    stream.write(json.dumps(data, separators=(',', ':')) + '\n')
+
+
+def run(list_inventory, host_vars=None, argv=None):
+    """Answer ``--list`` with ``list_inventory()`` or ``--host`` with ``host_vars(host)``.
+
+    Without ``host_vars``, ``--host`` is answered from the ``_meta`` of the
+    ``--list`` document.
+    """
+    mode, host = request(argv) or parse(argv)
+    if mode == 'list':
+        dump(list_inventory())
+    elif host_vars is not None:
+        dump(host_vars(host))
+    else:
+        dump(list_inventory().get('_meta', {}).get('hostvars', {}).get(host, {}))
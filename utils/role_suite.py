@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""Generate a role and include heavy playbook and time its startup, full and with --tags.
+
+For every --includes mode the suite is written to <output-dir>/<mode>/:
+
+    site.yml                      one play on localhost pulling in every role
+    roles/role_NNN/tasks/main.yml --tasks tasks and the include of level_1.yml
+    roles/role_NNN/tasks/level_D.yml  the same, nested --depth levels deep
+    roles/role_NNN/defaults/main.yml  --defaults vars
+
+static uses import_role/import_tasks, so everything is parsed before the
+first task; dynamic uses include_role/include_tasks tagged always, so every
+role is loaded when it is reached.  --tag-density of the tasks get one of
+--tag-count suite_tag_NN tags.  Every suite runs in full and with --tags
+for the --select first tags, --runs times each, with the task_timing
+callback:
+
+    utils/role_suite.py --roles 300 --depth 3 --tasks 5 --tag-density 0.2 \\
+        --includes static,dynamic --runs 3
+
+One summary line per run, with the seconds from launching ansible-playbook
+to the start of its first task, the peak RSS of the controller and the
+tasks that ran against the tasks expected, is appended to
+<output-dir>/summary.jsonl and printed.
+"""
+from argparse import ArgumentParser
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+INCLUDE_ACTIONS = ('include_tasks', 'import_tasks', 'include_role', 'import_role',
+                   'ansible.builtin.include_tasks', 'ansible.builtin.include_role')
+MODULES = {'static': ('import_role', 'import_tasks'),
+           'dynamic': ('include_role', 'include_tasks')}
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--roles', type=int, default=50, help='Roles (default: 50)')
+    parser.add_argument('--depth', type=int, default=2, help='Levels of include_tasks per role (default: 2)')
+    parser.add_argument('--tasks', type=int, default=5, help='Tasks per task file (default: 5)')
+    parser.add_argument('--defaults', type=int, default=10, help='Default vars per role (default: 10)')
+    parser.add_argument('--includes', type=lambda value: value.split(','), default=['static', 'dynamic'],
+                        help='Include modes to run, of static,dynamic (default: static,dynamic)')
+    parser.add_argument('--tag-density', type=float, default=0.1, help='Share of tagged tasks (default: 0.1)')
+    parser.add_argument('--tag-count', type=int, default=10, help='Distinct tags (default: 10)')
+    parser.add_argument('--select', type=int, default=1, help='Tags to pass to --tags (default: 1)')
+    parser.add_argument('--runs', type=int, default=1, help='Runs per suite and selection (default: 1)')
+    parser.add_argument('--output-dir', default='role_suite', help='Directory for the suites and timings '
+                                                                  '(default: role_suite)')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='ansible-playbook executable')
+    return parser.parse_args()
+
+
+class RoleSuite(object):
+
+    def __init__(self, roles, depth, tasks, defaults, tag_density, tag_count):
+        self.roles = ['role_{:03d}'.format(r) for r in range(max(1, roles))]
+        self.depth = max(0, depth)
+        self.tasks = max(1, tasks)
+        self.defaults = defaults
+        self.tag_density = min(max(tag_density, 0.0), 1.0)
+        self.tag_count = max(1, tag_count)
+        self.task_count = 0
+        self.tagged = dict((self.tag(k), 0) for k in range(self.tag_count))
+
+    def tag(self, k):
+        return 'suite_tag_{:02d}'.format(k)
+
+    def task(self, role, level, t):
+        """The next task; every 1 / --tag-density'th gets the next of the tags in turn."""
+        index = self.task_count
+        self.task_count += 1
+        task = {'name': '{} level {} task {}'.format(role, level, t),
+                'debug': {'msg': '{{{{ {}_default_{:02d} | default(\'\') }}}}'.format(role, t % max(1, self.defaults))}}
+        if int((index + 1) * self.tag_density) > int(index * self.tag_density):
+            tag = self.tag(sum(self.tagged.values()) % self.tag_count)
+            task['tags'] = [tag]
+            self.tagged[tag] += 1
+        return task
+
+    def include(self, module, name):
+        task = {module: name if module.endswith('_tasks') else {'name': name}}
+        if module.startswith('include'):
+            task['tags'] = ['always']
+        return task
+
+    def write_file(self, path, data):
+        with open(path, 'w') as yaml_file:
+            yaml_file.write('---\n' + json.dumps(data, sort_keys=True, indent=2) + '\n')
+
+    def write(self, directory, mode):
+        """Write the suite for include ``mode`` and return the count of tasks per tag."""
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        role_module, tasks_module = MODULES[mode]
+        self.task_count = 0
+        self.tagged = dict((self.tag(k), 0) for k in range(self.tag_count))
+        for role in self.roles:
+            tasks_dir = os.path.join(directory, 'roles', role, 'tasks')
+            defaults_dir = os.path.join(directory, 'roles', role, 'defaults')
+            os.makedirs(tasks_dir)
+            os.makedirs(defaults_dir)
+            self.write_file(os.path.join(defaults_dir, 'main.yml'),
+                            dict(('{}_default_{:02d}'.format(role, d), '{} default {}'.format(role, d))
+                                 for d in range(self.defaults)))
+            for level in range(self.depth + 1):
+                tasks = [self.task(role, level, t) for t in range(self.tasks)]
+                if level < self.depth:
+                    tasks.append(self.include(tasks_module, 'level_{}.yml'.format(level + 1)))
+                self.write_file(os.path.join(tasks_dir, 'main.yml' if level == 0 else 'level_{}.yml'.format(level)),
+                                tasks)
+        self.write_file(os.path.join(directory, 'site.yml'),
+                        [{'name': 'Run the {} role suite'.format(mode), 'hosts': 'localhost', 'connection': 'local',
+                          'gather_facts': False,
+                          'tasks': [self.include(role_module, role) for role in self.roles]}])
+        return self.tagged
+
+
+def run(args, directory, mode, selected, expected, attempt):
+    name = '{}-{}-{}'.format(mode, 'tags' if selected else 'full', attempt)
+    timings = os.path.join(args.output_dir, name + '.jsonl')
+    if os.path.exists(timings):
+        os.unlink(timings)
+    env = dict(os.environ,
+               ANSIBLE_CALLBACKS_ENABLED='task_timing',
+               ANSIBLE_CALLBACK_WHITELIST='task_timing',
+               ANSIBLE_CALLBACK_PLUGINS=os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                                                     'callback_plugins'),
+               ANSIBLE_ROLES_PATH=os.path.join(directory, 'roles'),
+               TASK_TIMING_OUTPUT_FILE=os.path.abspath(timings))
+    command = [args.ansible_playbook, '-i', 'localhost,', os.path.join(directory, 'site.yml')]
+    if selected:
+        command += ['--tags', ','.join(selected)]
+    started = time.time()
+    with open(os.path.join(args.output_dir, name + '.log'), 'w') as log:
+        process = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # The rusage of this one child, rather than the running maximum over
+        # every child resource.getrusage(RUSAGE_CHILDREN) would give.
+        _, status, usage = os.wait4(process.pid, 0)
+    ended = time.time()
+    summary = {'includes': mode, 'tags': selected, 'run': attempt, 'roles': args.roles, 'depth': args.depth,
+               'tasks_per_file': args.tasks, 'tag_density': args.tag_density,
+               'rc': os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status),
+               'wall_seconds': ended - started,
+               'peak_rss_mb': usage.ru_maxrss / 1024.0,
+               'cpu_seconds': usage.ru_utime + usage.ru_stime,
+               'tasks_expected': expected, 'timings': timings}
+    if os.path.exists(timings):
+        with open(timings) as lines:
+            records = [json.loads(line) for line in lines]
+        host_tasks = [r for r in records if r['type'] == 'host_task']
+        tasks = [r for r in host_tasks if r['action'] not in INCLUDE_ACTIONS]
+        summary['tasks_run'] = len(tasks)
+        if host_tasks:
+            summary['first_task_seconds'] = min(r['start'] for r in host_tasks) - started
+            summary['task_phase_seconds'] = max(r['end'] for r in host_tasks) - min(r['start'] for r in host_tasks)
+    return summary
+
+
+def main():
+    args = parse_args()
+    unknown = set(args.includes) - set(MODULES)
+    if unknown:
+        raise SystemExit('unknown include modes: {}'.format(', '.join(sorted(unknown))))
+    if not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+    suite = RoleSuite(args.roles, args.depth, args.tasks, args.defaults, args.tag_density, args.tag_count)
+    selected = [suite.tag(k) for k in range(min(args.select, args.tag_count))]
+    failed = False
+    with open(os.path.join(args.output_dir, 'summary.jsonl'), 'a') as summaries:
+        for mode in args.includes:
+            directory = os.path.abspath(os.path.join(args.output_dir, mode))
+            tagged = suite.write(directory, mode)
+            for tags, expected in (([], suite.task_count), (selected, sum(tagged[tag] for tag in selected))):
+                for attempt in range(args.runs):
+                    summary = run(args, directory, mode, tags, expected, attempt)
+                    failed = failed or summary['rc'] != 0 or summary.get('tasks_run') != expected
+                    summaries.write(json.dumps(summary, sort_keys=True) + '\n')
+                    summaries.flush()
+                    sys.stdout.write(json.dumps(summary, sort_keys=True) + '\n')
+                    sys.stdout.flush()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()